@@ -34,6 +34,7 @@ class ProductAdmin(admin.ModelAdmin):
 class ProductVariantAdmin(admin.ModelAdmin):
     list_display = ("sku", "product", "price", "status", "created_at", "updated_at")
     list_filter = ("status",)
+    list_select_related = ("product",)
     search_fields = ("sku",)
     ordering = ("sku",)
     raw_id_fields = ("product",)
@@ -50,6 +51,7 @@ class AttributeAdmin(admin.ModelAdmin):
 @admin.register(ProductAttributeValue)
 class ProductAttributeValueAdmin(admin.ModelAdmin):
     list_display = ("attribute", "product", "variant", "value", "created_at", "updated_at")
+    list_select_related = ("attribute", "product", "variant")
     search_fields = ("value",)
     raw_id_fields = ("attribute", "product", "variant")
     ordering = ("attribute",)
@@ -59,10 +61,32 @@ class ProductAttributeValueAdmin(admin.ModelAdmin):
 class MediaAdmin(admin.ModelAdmin):
     list_display = ("product", "variant", "url", "is_primary", "sort_order", "created_at", "updated_at")
     list_filter = ("is_primary",)
+    list_select_related = ("product", "variant__product")
     search_fields = ("url", "alt_text")
     raw_id_fields = ("product", "variant")
     ordering = ("sort_order", "id")
 
+    def get_queryset(self, request):
+        # The changelist never shows alt_text (or other wide columns); limit
+        # the SELECT to what is rendered, including the joined titles/SKU.
+        return (
+            super()
+            .get_queryset(request)
+            .only(
+                "id",
+                "url",
+                "is_primary",
+                "sort_order",
+                "created_at",
+                "updated_at",
+                "product__id",
+                "product__title",
+                "variant__id",
+                "variant__sku",
+                "variant__product__title",
+            )
+        )
+
 
 @admin.register(Collection)
 class CollectionAdmin(admin.ModelAdmin):
@@ -76,5 +100,6 @@ class CollectionAdmin(admin.ModelAdmin):
 @admin.register(CollectionProduct)
 class CollectionProductAdmin(admin.ModelAdmin):
     list_display = ("collection", "product", "sort_order", "created_at", "updated_at")
+    list_select_related = ("collection", "product")
     raw_id_fields = ("collection", "product")
     ordering = ("collection", "sort_order")
@@ -1,4 +1,11 @@
-"""Shared enumerations and choices used across apps."""
+"""Shared enumerations and choices used across apps.
+
+Statuses are deliberately stored as short TextChoices strings rather than
+smallint-backed IntegerChoices: the string codes are part of the public API
+contract (serializers and the OpenAPI enum overrides expose them verbatim),
+and the few bytes saved per index entry do not justify a dual-column shim.
+Revisit only if a status index ever shows up as a real hot spot.
+"""
 
 from django.db import models
 
@@ -63,3 +70,17 @@ class AttributeInputType(models.TextChoices):
     NUMBER = "number", "Number"
     BOOLEAN = "boolean", "Boolean"
     SELECT = "select", "Select"
+
+
+# Frozen value sets for hot-path membership checks. TextChoices recomputes
+# `.values` on every access, so validation code should probe these instead.
+ACTIVE_INACTIVE_VALUES = frozenset(ActiveInactive.values)
+DRAFT_PUBLISHED_VALUES = frozenset(DraftPublished.values)
+MOVEMENT_TYPE_VALUES = frozenset(MovementType.values)
+RESERVATION_STATE_VALUES = frozenset(ReservationState.values)
+CART_STATUS_VALUES = frozenset(CartStatus.values)
+ORDER_STATUS_VALUES = frozenset(OrderStatus.values)
+PAYMENT_INTENT_STATUS_VALUES = frozenset(PaymentIntentStatus.values)
+PAYMENT_PROVIDER_VALUES = frozenset(PaymentProvider.values)
+CURRENCY_VALUES = frozenset(Currency.values)
+ATTRIBUTE_INPUT_TYPE_VALUES = frozenset(AttributeInputType.values)
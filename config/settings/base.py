@@ -26,6 +26,10 @@ ORDERS_WEBHOOK_ALLOWED_IPS = config("ORDERS_WEBHOOK_ALLOWED_IPS", default="", ca
 if not ORDERS_WEBHOOK_ALLOWED_IPS:
     ORDERS_WEBHOOK_ALLOWED_IPS = PAYSTACK_WEBHOOK_IPS
 
+# Drain the orders outbox inline after each mutation. Set to False when a
+# worker (cron/queue) is draining `process_order_outbox` out of band.
+ORDERS_OUTBOX_EAGER = config("ORDERS_OUTBOX_EAGER", default=True, cast=bool)
+
 
 INSTALLED_APPS = [
     "django.contrib.admin",
@@ -16,6 +16,9 @@ DATABASES = {
 # Keep console email backend in tests
 EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
 
+# Fast (insecure) hashing; every UserFactory() hashes a password
+PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
 # Slightly relax throttling for tests to reduce flakiness
 REST_FRAMEWORK = {**BASE_REST_FRAMEWORK}
 REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"] = {
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.17 on 2026-08-28 03:29
+
+import django.db.models.expressions
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0013_mysql_primary_media_uniques'),
+        ('inventory', '0002_stockreservation_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='stockitem',
+            name='available_qty',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.expressions.CombinedExpression(models.F('quantity'), '-', models.F('reserved')), output_field=models.IntegerField()),
+        ),
+        migrations.AddIndex(
+            model_name='stockitem',
+            index=models.Index(condition=models.Q(('available_qty__gt', 0)), fields=['available_qty'], name='stockitem_available_idx'),
+        ),
+    ]
@@ -13,6 +13,13 @@ class StockItem(TimeStampedModel):
     variant = models.ForeignKey("catalog.ProductVariant", null=True, blank=True, on_delete=models.CASCADE)
     quantity = models.IntegerField(default=0)
     reserved = models.IntegerField(default=0)
+    # Stored in the database so availability filters can use an index
+    # instead of recomputing quantity - reserved per row.
+    available_qty = models.GeneratedField(
+        expression=models.F("quantity") - models.F("reserved"),
+        output_field=models.IntegerField(),
+        db_persist=True,
+    )
 
     class Meta:
         ordering = ["-updated_at", "id"]
@@ -28,6 +35,11 @@ class StockItem(TimeStampedModel):
         ]
         indexes = [
             models.Index(fields=["variant"]),
+            models.Index(
+                fields=["available_qty"],
+                name="stockitem_available_idx",
+                condition=models.Q(available_qty__gt=0),
+            ),
         ]
 
     def __str__(self) -> str:  # pragma: no cover
@@ -4,23 +4,19 @@ from .models import StockItem, StockReservation
 
 
 def available_quantity_for_stock_item(stock_item_id: int) -> int:
-    try:
-        item = StockItem.objects.only("quantity", "reserved").get(id=stock_item_id)
-    except StockItem.DoesNotExist:
-        return 0
-    return int(item.quantity) - int(item.reserved)
+    available = StockItem.objects.filter(id=stock_item_id).values_list("available_qty", flat=True).first()
+    return int(available or 0)
 
 
 def list_stock_for_product(product_id: int):
-    qs = StockItem.objects.filter(variant__product_id=product_id).select_related("variant")
+    # Read the stored availability column and skip model hydration entirely;
+    # the variant SKU comes from the same JOIN the filter already requires.
+    rows = StockItem.objects.filter(variant__product_id=product_id).values_list(
+        "variant__sku", "quantity", "reserved", "available_qty"
+    )
     return [
-        {
-            "variant": s.variant.sku if s.variant else None,
-            "quantity": s.quantity,
-            "reserved": s.reserved,
-            "available": int(s.quantity) - int(s.reserved),
-        }
-        for s in qs
+        {"variant": sku, "quantity": quantity, "reserved": reserved, "available": available}
+        for sku, quantity, reserved, available in rows
     ]
 
 
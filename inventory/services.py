@@ -1,6 +1,8 @@
 """Inventory services (single-location): transactional stock movements."""
 
-from django.db import transaction
+from django.db import models, transaction
+from django.db.models.functions import Greatest
+from django.utils import timezone
 
 from .models import StockItem, StockMovement
 
@@ -48,14 +50,16 @@ def create_reservation(*, variant_id: int, quantity: int, reference: str, expire
     if quantity <= 0:
         raise MovementError("Reservation quantity must be positive")
     # Ensure a stock item exists for the variant
-    item, _ = StockItem.objects.select_for_update().get_or_create(
-        variant_id=variant_id, defaults={"quantity": 0, "reserved": 0}
-    )
-    available = int(item.quantity) - int(item.reserved)
-    if quantity > available:
+    StockItem.objects.get_or_create(variant_id=variant_id, defaults={"quantity": 0, "reserved": 0})
+    # Claim the quantity with a single conditional UPDATE: the availability
+    # check lives in the WHERE clause, so concurrent reservations for a hot
+    # SKU never serialize on a read-modify-write lock.
+    claimed = StockItem.objects.filter(
+        variant_id=variant_id,
+        quantity__gte=models.F("reserved") + quantity,
+    ).update(reserved=models.F("reserved") + quantity, updated_at=timezone.now())
+    if not claimed:
         raise MovementError("Insufficient available quantity to reserve")
-    item.reserved = int(item.reserved) + int(quantity)
-    item.save(update_fields=["reserved", "updated_at"])
     return StockReservation.objects.create(
         variant_id=variant_id,
         quantity=quantity,
@@ -75,9 +79,12 @@ def release_reservation(*, reservation_id: int):
         return
     if res.state != StockReservation.STATE_ACTIVE:
         return
-    item = StockItem.objects.select_for_update().get(variant_id=res.variant_id)
-    item.reserved = max(0, int(item.reserved) - int(res.quantity))
-    item.save(update_fields=["reserved", "updated_at"])
+    # Single UPDATE with F-expressions: only the changed column is written
+    # and the decrement happens in the database.
+    StockItem.objects.filter(variant_id=res.variant_id).update(
+        reserved=Greatest(models.F("reserved") - res.quantity, 0),
+        updated_at=timezone.now(),
+    )
     res.state = StockReservation.STATE_RELEASED
     res.save(update_fields=["state", "updated_at"])
 
@@ -92,16 +99,23 @@ def convert_reservation_to_order(*, reservation_id: int, reason: str = "order",
         return
     if res.state != StockReservation.STATE_ACTIVE:
         return
-    item = StockItem.objects.select_for_update().get(variant_id=res.variant_id)
-    # Deduct reserved and quantity atomically
-    item.reserved = max(0, int(item.reserved) - int(res.quantity))
-    # Use signed movement for fulfillment
-    if res.quantity > (int(item.quantity)):
+    # Deduct reserved and quantity in one guarded UPDATE: the stock check
+    # lives in the WHERE clause, so no locked read-modify-write is needed.
+    # A single-statement CTE fusing the movement insert as well was
+    # considered but is PostgreSQL-only; this form stays portable.
+    fulfilled = StockItem.objects.filter(
+        variant_id=res.variant_id,
+        quantity__gte=res.quantity,
+    ).update(
+        reserved=Greatest(models.F("reserved") - res.quantity, 0),
+        quantity=models.F("quantity") - res.quantity,
+        updated_at=timezone.now(),
+    )
+    if not fulfilled:
         raise MovementError("Insufficient stock to fulfill reservation")
-    item.quantity = int(item.quantity) - int(res.quantity)
-    item.save(update_fields=["quantity", "reserved", "updated_at"])
+    item_id = StockItem.objects.filter(variant_id=res.variant_id).values_list("id", flat=True).first()
     StockMovement.objects.create(
-        stock_item=item,
+        stock_item_id=item_id,
         movement_type=StockMovement.TYPE_OUTBOUND,
         quantity=-int(res.quantity),
         reason=reason,
@@ -9,29 +9,35 @@ from rest_framework.test import APIClient
 
 pytestmark = pytest.mark.django_db
 
+# Resolved once at import; these routes take no args and reverse() walks the
+# URL patterns on every call.
+STOCK_ITEM_LIST_URL = reverse("stock-item-list")
+MOVEMENT_LIST_URL = reverse("movement-list")
+RESERVATION_LIST_URL = reverse("reservation-list")
+
 
 def test_stock_item_list_filters_updated_after_and_ids():
     api = APIClient()
     variant = ProductVariantFactory(price=Decimal("10.00"))
     StockItem.objects.create(variant=variant, quantity=5, reserved=2)
     # No filters
-    r0 = api.get(reverse("stock-item-list"))
+    r0 = api.get(STOCK_ITEM_LIST_URL)
     assert r0.status_code == 200
     # product_id filter
-    r1 = api.get(reverse("stock-item-list"), {"product_id": variant.product_id})
+    r1 = api.get(STOCK_ITEM_LIST_URL, {"product_id": variant.product_id})
     assert r1.status_code == 200 and r1.json()["count"] >= 1
     # variant_id filter
-    r2 = api.get(reverse("stock-item-list"), {"variant_id": variant.id})
+    r2 = api.get(STOCK_ITEM_LIST_URL, {"variant_id": variant.id})
     assert r2.status_code == 200 and r2.json()["count"] >= 1
     # sku filter
-    r3 = api.get(reverse("stock-item-list"), {"sku": variant.sku})
+    r3 = api.get(STOCK_ITEM_LIST_URL, {"sku": variant.sku})
     assert r3.status_code == 200 and r3.json()["count"] >= 1
     # updated_after invalid -> ignored
-    r4 = api.get(reverse("stock-item-list"), {"updated_after": "not-a-date"})
+    r4 = api.get(STOCK_ITEM_LIST_URL, {"updated_after": "not-a-date"})
     assert r4.status_code == 200
     # updated_after valid -> filter
     ts = (datetime.now(timezone.utc) - timedelta(days=1)).isoformat()
-    r5 = api.get(reverse("stock-item-list"), {"updated_after": ts})
+    r5 = api.get(STOCK_ITEM_LIST_URL, {"updated_after": ts})
     assert r5.status_code == 200
 
 
@@ -41,17 +47,17 @@ def test_movement_list_filters_created_after_and_type():
     item = StockItem.objects.create(variant=variant, quantity=5, reserved=0)
     StockMovement.objects.create(stock_item=item, movement_type="inbound", quantity=5)
     # stock_item filter
-    r1 = api.get(reverse("movement-list"), {"stock_item": item.id})
+    r1 = api.get(MOVEMENT_LIST_URL, {"stock_item": item.id})
     assert r1.status_code == 200 and r1.json()["count"] >= 1
     # movement_type filter
-    r2 = api.get(reverse("movement-list"), {"movement_type": "inbound"})
+    r2 = api.get(MOVEMENT_LIST_URL, {"movement_type": "inbound"})
     assert r2.status_code == 200
     # created_after invalid -> ignored
-    r3 = api.get(reverse("movement-list"), {"created_after": "bad-date"})
+    r3 = api.get(MOVEMENT_LIST_URL, {"created_after": "bad-date"})
     assert r3.status_code == 200
     # created_after valid -> filtered
     ts = (datetime.now(timezone.utc) - timedelta(days=1)).isoformat()
-    r4 = api.get(reverse("movement-list"), {"created_after": ts})
+    r4 = api.get(MOVEMENT_LIST_URL, {"created_after": ts})
     assert r4.status_code == 200
 
 
@@ -60,15 +66,15 @@ def test_reservation_list_filters_state_and_expires():
     variant = ProductVariantFactory(price=Decimal("10.00"))
     res = StockReservation.objects.create(variant=variant, quantity=1, reference="r1")
     # variant filter
-    r1 = api.get(reverse("reservation-list"), {"variant_id": variant.id})
+    r1 = api.get(RESERVATION_LIST_URL, {"variant_id": variant.id})
     assert r1.status_code == 200 and r1.json()["count"] >= 1
     # state filter
-    r2 = api.get(reverse("reservation-list"), {"state": res.state})
+    r2 = api.get(RESERVATION_LIST_URL, {"state": res.state})
     assert r2.status_code == 200
     # expires_before invalid -> ignored
-    r3 = api.get(reverse("reservation-list"), {"expires_before": "bad-date"})
+    r3 = api.get(RESERVATION_LIST_URL, {"expires_before": "bad-date"})
     assert r3.status_code == 200
     # expires_before valid -> filtered
     ts = (datetime.now(timezone.utc) + timedelta(days=1)).isoformat()
-    r4 = api.get(reverse("reservation-list"), {"expires_before": ts})
+    r4 = api.get(RESERVATION_LIST_URL, {"expires_before": ts})
     assert r4.status_code == 200
@@ -10,13 +10,39 @@ class OrderAdmin(admin.ModelAdmin):
     search_fields = ("number", "email")
     date_hierarchy = "created_at"
 
+    def get_queryset(self, request):
+        # `user` is rendered per row in list_display; join it up front
+        return super().get_queryset(request).select_related("user")
+
 
 @admin.register(OrderItem)
 class OrderItemAdmin(admin.ModelAdmin):
     list_display = ("id", "order", "variant", "quantity", "unit_price")
+    list_select_related = ("order", "variant", "variant__product")
     list_filter = ("order",)
     search_fields = ("variant__sku", "product_title")
 
+    def get_queryset(self, request):
+        # Prune the SELECT to the columns the changelist actually renders;
+        # variant__product is joined because ProductVariant.__str__ uses it.
+        return (
+            super()
+            .get_queryset(request)
+            .select_related("order", "variant__product")
+            .only(
+                "id",
+                "quantity",
+                "unit_price",
+                "product_title",
+                "order__id",
+                "order__user",
+                "order__status",
+                "variant__id",
+                "variant__sku",
+                "variant__product__title",
+            )
+        )
+
 
 @admin.register(IdempotencyKey)
 class IdempotencyKeyAdmin(admin.ModelAdmin):
@@ -29,6 +55,7 @@ class IdempotencyKeyAdmin(admin.ModelAdmin):
 @admin.register(OrderStatusEvent)
 class OrderStatusEventAdmin(admin.ModelAdmin):
     list_display = ("id", "order", "from_status", "to_status", "reason", "created_at")
+    list_select_related = ("order",)
     list_filter = ("from_status", "to_status", "created_at")
     search_fields = ("order__number", "reason")
     date_hierarchy = "created_at"
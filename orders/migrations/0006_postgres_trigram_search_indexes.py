@@ -0,0 +1,55 @@
+from django.db import migrations
+
+
+def forwards(apps, schema_editor):
+    # Apply only on PostgreSQL: trigram GIN indexes let the admin's
+    # icontains search (ILIKE '%q%') use an index scan instead of a
+    # sequential scan. Other vendors keep the default behaviour.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    statements = [
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        "CREATE INDEX IF NOT EXISTS orders_number_trgm ON orders_order USING gin (number gin_trgm_ops)",
+        "CREATE INDEX IF NOT EXISTS orders_email_trgm ON orders_order USING gin (email gin_trgm_ops)",
+        "CREATE INDEX IF NOT EXISTS orders_idem_key_trgm ON orders_idempotencykey USING gin (key gin_trgm_ops)",
+        "CREATE INDEX IF NOT EXISTS orders_idem_scope_trgm ON orders_idempotencykey USING gin (scope gin_trgm_ops)",
+        "CREATE INDEX IF NOT EXISTS orders_idem_path_trgm ON orders_idempotencykey USING gin (path gin_trgm_ops)",
+    ]
+
+    cursor = schema_editor.connection.cursor()
+    try:
+        for sql in statements:
+            cursor.execute(sql)
+    finally:
+        cursor.close()
+
+
+def backwards(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    statements = [
+        "DROP INDEX IF EXISTS orders_number_trgm",
+        "DROP INDEX IF EXISTS orders_email_trgm",
+        "DROP INDEX IF EXISTS orders_idem_key_trgm",
+        "DROP INDEX IF EXISTS orders_idem_scope_trgm",
+        "DROP INDEX IF EXISTS orders_idem_path_trgm",
+    ]
+
+    cursor = schema_editor.connection.cursor()
+    try:
+        for sql in statements:
+            cursor.execute(sql)
+    finally:
+        cursor.close()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("orders", "0005_rename_orders_event_order_created_idx_orders_orde_order_i_1e3f4d_idx"),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
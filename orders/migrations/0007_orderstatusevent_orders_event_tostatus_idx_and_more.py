@@ -0,0 +1,21 @@
+# Generated by Django 5.2.17 on 2026-08-28 03:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0006_postgres_trigram_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='orderstatusevent',
+            index=models.Index(fields=['to_status', 'created_at'], name='orders_event_tostatus_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='orderstatusevent',
+            index=models.Index(fields=['from_status'], name='orders_event_fromstatus_idx'),
+        ),
+    ]
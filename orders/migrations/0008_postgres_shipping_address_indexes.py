@@ -0,0 +1,54 @@
+from django.db import migrations
+
+
+def forwards(apps, schema_editor):
+    # Apply only on PostgreSQL: shipping_address stays JSON for the API
+    # contract, but containment filters get a jsonb_path_ops GIN index and
+    # the commonly-queried country key is projected into an indexed stored
+    # generated column. Other vendors keep the plain JSON column.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    statements = [
+        ("CREATE INDEX IF NOT EXISTS orders_ship_gin ON orders_order " "USING gin (shipping_address jsonb_path_ops)"),
+        (
+            "ALTER TABLE orders_order ADD COLUMN IF NOT EXISTS ship_country varchar(2) "
+            "GENERATED ALWAYS AS (upper(shipping_address->>'country')) STORED"
+        ),
+        "CREATE INDEX IF NOT EXISTS orders_ship_country_idx ON orders_order (ship_country)",
+    ]
+
+    cursor = schema_editor.connection.cursor()
+    try:
+        for sql in statements:
+            cursor.execute(sql)
+    finally:
+        cursor.close()
+
+
+def backwards(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    statements = [
+        "DROP INDEX IF EXISTS orders_ship_country_idx",
+        "ALTER TABLE orders_order DROP COLUMN IF EXISTS ship_country",
+        "DROP INDEX IF EXISTS orders_ship_gin",
+    ]
+
+    cursor = schema_editor.connection.cursor()
+    try:
+        for sql in statements:
+            cursor.execute(sql)
+    finally:
+        cursor.close()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("orders", "0007_orderstatusevent_orders_event_tostatus_idx_and_more"),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
@@ -0,0 +1,40 @@
+from django.db import migrations
+
+
+def forwards(apps, schema_editor):
+    # Apply only on PostgreSQL: a partial index over in-flight idempotency
+    # keys (response not yet stored) stays the size of the concurrent
+    # request set rather than the full key history.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    cursor = schema_editor.connection.cursor()
+    try:
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idempotency_inflight_idx "
+            "ON orders_idempotencykey (key, scope, path, method) "
+            "WHERE response_code IS NULL"
+        )
+    finally:
+        cursor.close()
+
+
+def backwards(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    cursor = schema_editor.connection.cursor()
+    try:
+        cursor.execute("DROP INDEX IF EXISTS idempotency_inflight_idx")
+    finally:
+        cursor.close()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("orders", "0008_postgres_shipping_address_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
@@ -46,6 +46,13 @@ class OrderItem(TimeStampedModel):
     variant_sku = models.CharField(max_length=64, blank=True)
     quantity = models.PositiveIntegerField(default=1)
     unit_price = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal("0.00"))
+    # Stored in the database so totals aggregate natively instead of
+    # re-multiplying per row in Python.
+    line_total = models.GeneratedField(
+        expression=models.F("unit_price") * models.F("quantity"),
+        output_field=models.DecimalField(max_digits=14, decimal_places=2),
+        db_persist=True,
+    )
 
     class Meta:
         ordering = ["id"]
@@ -59,10 +66,6 @@ class OrderItem(TimeStampedModel):
     def __str__(self) -> str:  # pragma: no cover
         return f"OrderItem#{self.id} order={self.order_id} variant={self.variant_id} qty={self.quantity}"
 
-    @property
-    def line_total(self) -> Decimal:
-        return (self.unit_price or Decimal("0.00")) * Decimal(int(self.quantity))
-
 
 class IdempotencyKey(TimeStampedModel):
     """Stores idempotent request results to prevent duplicate processing."""
@@ -83,6 +86,35 @@ class IdempotencyKey(TimeStampedModel):
         ]
 
 
+class OrderOutbox(TimeStampedModel):
+    """Transactional outbox row for side effects of order mutations.
+
+    Mutations enqueue a row instead of doing I/O (e.g. email) inline; a
+    drainer dispatches pending rows by topic off the request path.
+    """
+
+    TOPIC_ORDER_PAID = "order.paid"
+
+    topic = models.CharField(max_length=64)
+    payload = models.JSONField(default=dict, blank=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [
+            # Pending rows are the tiny working set; a partial index keeps
+            # the drain query cheap regardless of total outbox size.
+            models.Index(
+                fields=["id"],
+                name="orders_outbox_pending_idx",
+                condition=models.Q(processed_at__isnull=True),
+            ),
+        ]
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"OrderOutbox#{self.id} topic={self.topic} processed={self.processed_at is not None}"
+
+
 class OrderStatusEvent(TimeStampedModel):
     """Audit trail of order status transitions."""
 
@@ -95,4 +127,6 @@ class OrderStatusEvent(TimeStampedModel):
         ordering = ["-created_at", "id"]
         indexes = [
             models.Index(fields=["order", "created_at"]),
+            models.Index(fields=["to_status", "created_at"], name="orders_event_tostatus_idx"),
+            models.Index(fields=["from_status"], name="orders_event_fromstatus_idx"),
         ]
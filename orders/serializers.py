@@ -5,6 +5,7 @@ as read-only serializer fields, rather than exposing denormalized DB columns.
 """
 
 from decimal import Decimal
+from functools import cached_property
 
 from rest_framework import serializers
 
@@ -30,6 +31,11 @@ class OrderItemSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "line_total"]
 
     def get_line_total(self, obj: OrderItem) -> Decimal:
+        # Saved rows carry the stored generated column; unsaved instances
+        # fall back to Python arithmetic (reading the field would trigger a
+        # refresh for a row that does not exist yet).
+        if obj.pk is not None and obj.line_total is not None:
+            return obj.line_total
         return (obj.unit_price or Decimal("0.00")) * Decimal(int(obj.quantity))
 
 
@@ -75,6 +81,11 @@ class OrderSerializer(serializers.ModelSerializer):
         ]
 
     def get_subtotal(self, obj: Order) -> Decimal:
+        # The list/detail views annotate the SQL sum of stored line totals;
+        # unannotated instances (e.g. mutation responses) fall back to Python.
+        annotated = getattr(obj, "subtotal_db", None)
+        if annotated is not None:
+            return annotated
         subtotal = Decimal("0.00")
         for item in obj.items.all():
             unit_price = item.unit_price or Decimal("0.00")
@@ -94,24 +105,35 @@ class OrderSerializer(serializers.ModelSerializer):
     def get_discount(self, obj: Order) -> Decimal:
         return self._pricing_value("discount")
 
-    def _pricing_value(self, name: str) -> Decimal:
-        """Return pricing input from context or initial data.
+    @cached_property
+    def _pricing(self) -> dict:
+        """Parse pricing inputs from context or initial data exactly once.
 
         Looks in `self.context['pricing']` or `self.context['pricing_overrides']`
         for a dict of values. Falls back to `self.initial_data` when present, and
         finally to Decimal("0.00"). Values are not persisted; they affect API
-        representation only.
+        representation only. Parsing once per serializer instance avoids
+        re-reading the context and rebuilding Decimals for every order row.
         """
         default = Decimal("0.00")
+        sources = []
         ctx = self.context.get("pricing") or self.context.get("pricing_overrides")
-        if isinstance(ctx, dict) and name in ctx:
-            try:
-                return Decimal(str(ctx[name]))
-            except Exception:
-                return default
-        if hasattr(self, "initial_data") and isinstance(self.initial_data, dict) and name in self.initial_data:
-            try:
-                return Decimal(str(self.initial_data[name]))
-            except Exception:
-                return default
-        return default
+        if isinstance(ctx, dict):
+            sources.append(ctx)
+        if hasattr(self, "initial_data") and isinstance(self.initial_data, dict):
+            sources.append(self.initial_data)
+        values = {}
+        for name in ("tax", "shipping", "discount"):
+            value = default
+            for source in sources:
+                if name in source:
+                    try:
+                        value = Decimal(str(source[name]))
+                    except Exception:
+                        value = default
+                    break
+            values[name] = value
+        return values
+
+    def _pricing_value(self, name: str) -> Decimal:
+        return self._pricing[name]
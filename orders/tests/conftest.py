@@ -0,0 +1,22 @@
+import pytest
+from cart.tests.factories import UserFactory
+from rest_framework.test import APIClient
+
+
+@pytest.fixture
+def api_client():
+    """Unauthenticated API client, one per test instead of one per call site."""
+    return APIClient()
+
+
+@pytest.fixture
+def user(db):
+    return UserFactory()
+
+
+@pytest.fixture
+def auth_client(api_client, user):
+    """API client authenticated as the `user` fixture."""
+    api_client.force_authenticate(user=user)
+    yield api_client
+    api_client.force_authenticate(user=None)
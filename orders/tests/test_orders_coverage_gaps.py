@@ -40,8 +40,10 @@ def test_serializer_initial_data_overrides():
 
 def test_pay_order_handles_logging_and_email_failures():
     order = _create_order_with_item()
+    # The outbox drain swallows dispatch failures itself, so the eager drain
+    # call is patched to raise directly to exercise pay_order's guard
     with patch("orders.services.logger.info", side_effect=Exception("log failure")):
-        with patch("orders.services.send_order_paid_email", side_effect=Exception("email failure")):
+        with patch("orders.services.process_order_outbox", side_effect=Exception("drain failure")):
             updated = pay_order(order)
             assert updated.status == Order.STATUS_PAID
 
@@ -114,6 +116,38 @@ def test_compute_request_hash_handles_unserializable_input():
     assert h is None
 
 
+def test_order_item_line_total_falls_back_for_unsaved_instances():
+    from orders.serializers import OrderItemSerializer
+
+    item = OrderItem(quantity=2, unit_price=Decimal("3.25"))
+    assert OrderItemSerializer().get_line_total(item) == Decimal("6.50")
+
+
+def test_order_admin_queryset_selects_user(rf):
+    from django.contrib.admin.sites import AdminSite
+    from orders.admin import OrderAdmin
+
+    order = _create_order_with_item()
+    admin = OrderAdmin(Order, AdminSite())
+    request = rf.get("/admin/orders/order/")
+    request.user = order.user
+    qs = admin.get_queryset(request)
+    assert "user" in qs.query.select_related
+
+
+def test_order_item_admin_queryset_renders_without_extra_queries(rf, django_assert_num_queries):
+    from django.contrib.admin.sites import AdminSite
+    from orders.admin import OrderItemAdmin
+
+    order = _create_order_with_item()
+    admin = OrderItemAdmin(OrderItem, AdminSite())
+    request = rf.get("/admin/orders/orderitem/")
+    request.user = order.user
+    with django_assert_num_queries(1):
+        rows = [(str(item.order), str(item.variant)) for item in admin.get_queryset(request)]
+    assert rows
+
+
 def test_webhook_validation_errors(client: APIClient):
     # unsupported event
     url = reverse("orders:order-webhook-payment")
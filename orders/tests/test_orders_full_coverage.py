@@ -19,6 +19,9 @@ from rest_framework.test import APIClient, APIRequestFactory
 
 pytestmark = pytest.mark.django_db
 
+# Resolved once per module; the webhook tests hit the same route repeatedly
+WEBHOOK_URL = reverse("orders:order-webhook-payment")
+
 
 def make_order_with_item(user=None) -> Order:
     user = user or UserFactory()
@@ -45,7 +48,7 @@ def test_serializer_invalid_pricing_context_and_initial_data():
 
 def test_pay_order_event_and_fulfillment_exceptions_are_swallowed():
     order = make_order_with_item()
-    with patch.object(OrderStatusEvent.objects, "create", side_effect=Exception("evt fail")):
+    with patch("orders.services.OrderStatusEvent.objects.bulk_create", side_effect=Exception("evt fail")):
         with patch("orders.services.schedule_fulfillment", side_effect=Exception("sched fail")):
             updated = pay_order(order)
             assert updated.status == Order.STATUS_PAID
@@ -69,7 +72,7 @@ def test_cancel_order_returns_when_already_cancelled():
 
 def test_cancel_order_exceptions_do_not_block():
     order = make_order_with_item()
-    with patch.object(OrderStatusEvent.objects, "create", side_effect=Exception("evt fail")):
+    with patch("orders.services.OrderStatusEvent.objects.bulk_create", side_effect=Exception("evt fail")):
         with patch("orders.services.logger.info", side_effect=Exception("log fail")):
             with patch("orders.services.initiate_reimbursement_for_cancellation", side_effect=Exception("refund fail")):
                 updated = cancel_order(order)
@@ -113,6 +116,14 @@ def test_verify_webhook_signature_paths(settings):
     req_bad = SimpleNamespace(headers={"X-Paystack-Signature": "bad"}, body=b"{}", META={})
     ok2, reason2 = verify_orders_webhook(req_bad)
     assert not ok2 and reason2 == "bad_signature"
+    # right length but not hex
+    req_nonhex = SimpleNamespace(headers={"X-Paystack-Signature": "z" * 128}, body=b"{}", META={})
+    ok2b, reason2b = verify_orders_webhook(req_nonhex)
+    assert not ok2b and reason2b == "bad_signature"
+    # well-formed hex but wrong digest
+    req_wrong = SimpleNamespace(headers={"X-Paystack-Signature": "0" * 128}, body=b"{}", META={})
+    ok2c, reason2c = verify_orders_webhook(req_wrong)
+    assert not ok2c and reason2c == "bad_signature"
     # good signature
     import hashlib
     import hmac
@@ -130,6 +141,15 @@ def test_verify_webhook_ip_allowlist_paths(settings):
     req = SimpleNamespace(headers={}, body=b"{}", META={"REMOTE_ADDR": "5.6.7.8"})
     ok, reason = verify_orders_webhook(req)
     assert not ok and reason == "ip_not_allowed"
+    # CIDR entries match any address in the range; junk entries are skipped
+    settings.ORDERS_WEBHOOK_ALLOWED_IPS = ["not-an-ip", "10.0.0.0/8"]
+    req_cidr = SimpleNamespace(headers={}, body=b"{}", META={"REMOTE_ADDR": "10.1.2.3"})
+    ok2, reason2 = verify_orders_webhook(req_cidr)
+    assert ok2 and reason2 is None
+    # Unparseable remote address is rejected
+    req_junk = SimpleNamespace(headers={}, body=b"{}", META={"REMOTE_ADDR": "garbage"})
+    ok3, reason3 = verify_orders_webhook(req_junk)
+    assert not ok3 and reason3 == "ip_not_allowed"
 
 
 def test_verify_webhook_verification_error(settings):
@@ -207,7 +227,7 @@ def test_orders_views_edge_branches(settings):
     settings.ORDERS_WEBHOOK_ALLOWED_IPS = ["1.2.3.4"]
     with patch("orders.views.logger.warning", side_effect=Exception("log fail")):
         resp = api.post(
-            reverse("orders:order-webhook-payment"),
+            WEBHOOK_URL,
             data={"order_id": 1, "event": "payment_succeeded"},
             format="json",
             HTTP_X_FORWARDED_FOR="5.6.7.8",
@@ -218,7 +238,7 @@ def test_orders_views_edge_branches(settings):
     settings.ORDERS_WEBHOOK_ALLOWED_IPS = []
     settings.ORDERS_WEBHOOK_SECRET = ""
     resp2 = api.post(
-        reverse("orders:order-webhook-payment"),
+        WEBHOOK_URL,
         data={"order_id": "foo", "event": "payment_succeeded"},
         format="json",
     )
@@ -228,7 +248,7 @@ def test_orders_views_edge_branches(settings):
     api.force_authenticate(user=owner)
     order2 = Order.objects.create(user=owner, status=Order.STATUS_CANCELLED)
     resp3 = api.post(
-        reverse("orders:order-webhook-payment"),
+        WEBHOOK_URL,
         data={"order_id": order2.id, "event": "payment_succeeded"},
         format="json",
     )
@@ -242,3 +262,57 @@ def test_orders_views_edge_branches(settings):
         format="json",
     )
     assert resp4.status_code == 404
+
+
+def test_pay_order_race_already_paid_returns_order():
+    user = UserFactory()
+    order = Order.objects.create(user=user)
+    # Another process wins the transition after this one loaded the row
+    Order.objects.filter(id=order.id).update(status=Order.STATUS_PAID)
+    result = pay_order(order)
+    assert result.status == Order.STATUS_PAID
+    # The losing call must not duplicate the audit event
+    assert OrderStatusEvent.objects.filter(order=order).count() == 0
+
+
+def test_pay_order_race_cancelled_raises():
+    user = UserFactory()
+    order = Order.objects.create(user=user)
+    Order.objects.filter(id=order.id).update(status=Order.STATUS_CANCELLED)
+    with pytest.raises(ValueError):
+        pay_order(order)
+
+
+def test_cancel_order_race_already_cancelled_returns_order():
+    user = UserFactory()
+    order = Order.objects.create(user=user)
+    Order.objects.filter(id=order.id).update(status=Order.STATUS_CANCELLED)
+    result = cancel_order(order)
+    assert result.status == Order.STATUS_CANCELLED
+    assert OrderStatusEvent.objects.filter(order=order).count() == 0
+
+
+def test_cancel_order_race_paid_raises():
+    user = UserFactory()
+    order = Order.objects.create(user=user)
+    Order.objects.filter(id=order.id).update(status=Order.STATUS_PAID)
+    with pytest.raises(ValueError):
+        cancel_order(order)
+
+
+def test_verify_webhook_allowlist_runs_before_signature(settings):
+    import hashlib
+    import hmac
+
+    settings.ORDERS_WEBHOOK_SECRET = "secret"
+    settings.ORDERS_WEBHOOK_ALLOWED_IPS = ["1.2.3.4"]
+    body = b"{}"
+    sig = hmac.new(b"secret", body, hashlib.sha512).hexdigest()
+    # Valid signature from a non-allowlisted address is still rejected
+    req_spoof = SimpleNamespace(headers={"X-Paystack-Signature": sig}, body=body, META={"REMOTE_ADDR": "5.6.7.8"})
+    ok, reason = verify_orders_webhook(req_spoof)
+    assert not ok and reason == "ip_not_allowed"
+    # Allowlisted address plus valid signature passes both gates
+    req_good = SimpleNamespace(headers={"X-Paystack-Signature": sig}, body=body, META={"REMOTE_ADDR": "1.2.3.4"})
+    ok2, reason2 = verify_orders_webhook(req_good)
+    assert ok2 and reason2 is None
@@ -7,17 +7,12 @@ from catalog.tests.factories import ProductVariantFactory
 from django.core import mail
 from django.urls import reverse
 from orders.emails import send_order_paid_email
-from orders.models import IdempotencyKey, Order, OrderItem, OrderStatusEvent
-from orders.services import compute_request_hash, with_idempotency
-from rest_framework.test import APIClient
+from orders.models import IdempotencyKey, Order, OrderItem, OrderOutbox, OrderStatusEvent
+from orders.services import compute_request_hash, process_order_outbox, with_idempotency
 
 
 @pytest.mark.django_db
-def test_order_update_email_and_address():
-    user = UserFactory()
-    client = APIClient()
-    client.force_authenticate(user=user)
-
+def test_order_update_email_and_address(auth_client, user):
     order = Order.objects.create(user=user, email="old@example.com")
     variant = ProductVariantFactory()
     OrderItem.objects.create(
@@ -39,7 +34,7 @@ def test_order_update_email_and_address():
             "country": "ng",
         },
     }
-    r = client.patch(url, data=payload, format="json")
+    r = auth_client.patch(url, data=payload, format="json")
     assert r.status_code == 200
     body = r.json()
     assert body["email"] == "new@example.com"
@@ -47,35 +42,24 @@ def test_order_update_email_and_address():
 
 
 @pytest.mark.django_db
-def test_order_update_invalid_email_returns_400():
-    user = UserFactory()
-    client = APIClient()
-    client.force_authenticate(user=user)
-
+def test_order_update_invalid_email_returns_400(auth_client, user):
     order = Order.objects.create(user=user)
     url = reverse("orders:order-update", kwargs={"order_id": order.id})
-    r = client.patch(url, data={"email": "bad"}, format="json")
+    r = auth_client.patch(url, data={"email": "bad"}, format="json")
     assert r.status_code == 400
     assert r.json()["detail"]
 
 
 @pytest.mark.django_db
-def test_order_update_requires_pending():
-    user = UserFactory()
-    client = APIClient()
-    client.force_authenticate(user=user)
-
+def test_order_update_requires_pending(auth_client, user):
     order = Order.objects.create(user=user, status=Order.STATUS_PAID)
     url = reverse("orders:order-update", kwargs={"order_id": order.id})
-    r = client.patch(url, data={"email": "new@example.com"}, format="json")
+    r = auth_client.patch(url, data={"email": "new@example.com"}, format="json")
     assert r.status_code == 400
 
 
 @pytest.mark.django_db
-def test_status_event_created_on_pay_and_cancel():
-    user = UserFactory()
-    client = APIClient()
-    client.force_authenticate(user=user)
+def test_status_event_created_on_pay_and_cancel(auth_client, user):
     order = Order.objects.create(user=user)
     variant = ProductVariantFactory()
     OrderItem.objects.create(
@@ -89,7 +73,7 @@ def test_status_event_created_on_pay_and_cancel():
 
     # Pay
     pay_url = reverse("orders:order-pay", kwargs={"order_id": order.id})
-    r1 = client.post(pay_url)
+    r1 = auth_client.post(pay_url)
     assert r1.status_code == 200
     order.refresh_from_db()
     assert OrderStatusEvent.objects.filter(order=order, to_status=Order.STATUS_PAID).exists()
@@ -99,24 +83,23 @@ def test_status_event_created_on_pay_and_cancel():
     order.status = Order.STATUS_PENDING
     order.save(update_fields=["status"])
     cancel_url = reverse("orders:order-cancel", kwargs={"order_id": order.id})
-    r2 = client.post(cancel_url)
+    r2 = auth_client.post(cancel_url)
     assert r2.status_code == 200
     order.refresh_from_db()
     assert OrderStatusEvent.objects.filter(order=order, to_status=Order.STATUS_CANCELLED).exists()
 
 
 @pytest.mark.django_db
-def test_orders_webhook_requires_signature_when_configured(settings):
+def test_orders_webhook_requires_signature_when_configured(api_client, settings):
     # Configure secret to force signature validation
     settings.ORDERS_WEBHOOK_SECRET = "sk_test_xxx"
 
-    client = APIClient()
     user = UserFactory()
     order = Order.objects.create(user=user)
     payload = {"order_id": order.id, "event": "payment_succeeded"}
     raw = json.dumps(payload).encode("utf-8")
     # No signature header provided → rejected
-    r = client.post(
+    r = api_client.post(
         "/api/v1/orders/webhooks/payment/",
         data=raw,
         content_type="application/json",
@@ -125,42 +108,35 @@ def test_orders_webhook_requires_signature_when_configured(settings):
 
 
 @pytest.mark.django_db
-def test_orders_list_filters():
-    user = UserFactory()
-    client = APIClient()
-    client.force_authenticate(user=user)
-
+def test_orders_list_filters(auth_client, user):
     o1 = Order.objects.create(user=user, number="ORD-100001", status=Order.STATUS_PENDING)
     o2 = Order.objects.create(user=user, number="ORD-100002", status=Order.STATUS_CANCELLED)
 
     # Filter by status
     url = reverse("orders:order-list")
-    r1 = client.get(url + "?status=cancelled")
+    r1 = auth_client.get(url + "?status=cancelled")
     assert r1.status_code == 200
     assert len(r1.json().get("results", [])) == 1
     assert r1.json()["results"][0]["number"] == o2.number
 
     # Filter by number
-    r2 = client.get(url + "?number=ORD-100001")
+    r2 = auth_client.get(url + "?number=ORD-100001")
     assert r2.status_code == 200
     assert len(r2.json().get("results", [])) == 1
     assert r2.json()["results"][0]["number"] == o1.number
 
     # Filter by start/end with simple ISO dates
-    r3 = client.get(url + "?start=2020-01-01")
+    r3 = auth_client.get(url + "?start=2020-01-01")
     assert r3.status_code == 200
     assert len(r3.json().get("results", [])) >= 1
 
-    r4 = client.get(url + "?end=2100-01-01")
+    r4 = auth_client.get(url + "?end=2100-01-01")
     assert r4.status_code == 200
     assert len(r4.json().get("results", [])) >= 1
 
 
 @pytest.mark.django_db
-def test_order_detail_pricing_params():
-    user = UserFactory()
-    client = APIClient()
-    client.force_authenticate(user=user)
+def test_order_detail_pricing_params(auth_client, user):
     order = Order.objects.create(user=user)
     variant = ProductVariantFactory()
     OrderItem.objects.create(
@@ -173,7 +149,7 @@ def test_order_detail_pricing_params():
     )
 
     url = reverse("orders:order-detail", kwargs={"order_id": order.id})
-    r = client.get(url + "?tax=2.50&shipping=5&discount=1.25")
+    r = auth_client.get(url + "?tax=2.50&shipping=5&discount=1.25")
     assert r.status_code == 200
     body = r.json()
     # Subtotal 20.00 + 2.50 + 5.00 - 1.25 = 26.25
@@ -286,37 +262,30 @@ def test_orderitem_line_total_property():
 
 
 @pytest.mark.django_db
-def test_pay_order_cannot_pay_cancelled():
-    user = UserFactory()
-    client = APIClient()
-    client.force_authenticate(user=user)
+def test_pay_order_cannot_pay_cancelled(auth_client, user):
     order = Order.objects.create(user=user, status=Order.STATUS_CANCELLED)
     url = reverse("orders:order-pay", kwargs={"order_id": order.id})
-    r = client.post(url)
+    r = auth_client.post(url)
     assert r.status_code == 400
 
 
 @pytest.mark.django_db
-def test_cancel_order_cannot_cancel_paid():
-    user = UserFactory()
-    client = APIClient()
-    client.force_authenticate(user=user)
+def test_cancel_order_cannot_cancel_paid(auth_client, user):
     order = Order.objects.create(user=user, status=Order.STATUS_PAID)
     url = reverse("orders:order-cancel", kwargs={"order_id": order.id})
-    r = client.post(url)
+    r = auth_client.post(url)
     assert r.status_code == 400
 
 
 @pytest.mark.django_db
-def test_orders_webhook_allowed_ip(settings):
+def test_orders_webhook_allowed_ip(api_client, settings):
     settings.ORDERS_WEBHOOK_SECRET = ""
     settings.ORDERS_WEBHOOK_ALLOWED_IPS = ["1.2.3.4"]
-    client = APIClient()
     user = UserFactory()
     order = Order.objects.create(user=user)
     payload = {"order_id": order.id, "event": "payment_succeeded"}
     raw = json.dumps(payload).encode("utf-8")
-    r = client.post(
+    r = api_client.post(
         "/api/v1/orders/webhooks/payment/",
         data=raw,
         content_type="application/json",
@@ -326,11 +295,132 @@ def test_orders_webhook_allowed_ip(settings):
 
 
 @pytest.mark.django_db
-def test_order_update_invalid_address_type():
-    user = UserFactory()
-    client = APIClient()
-    client.force_authenticate(user=user)
+def test_order_update_invalid_address_type(auth_client, user):
     order = Order.objects.create(user=user)
     url = reverse("orders:order-update", kwargs={"order_id": order.id})
-    r = client.patch(url, data={"shipping_address": "oops"}, format="json")
+    r = auth_client.patch(url, data={"shipping_address": "oops"}, format="json")
     assert r.status_code == 400
+
+
+@pytest.mark.django_db
+def test_pay_orders_bulk_batches_status_events():
+    from orders.services import pay_orders_bulk
+
+    user = UserFactory()
+    orders = [Order.objects.create(user=user) for _ in range(3)]
+    # Already-paid orders are skipped without generating an event
+    orders[2].status = Order.STATUS_PAID
+    orders[2].save(update_fields=["status"])
+
+    updated = pay_orders_bulk(orders)
+    assert all(o.status == Order.STATUS_PAID for o in updated)
+    assert OrderStatusEvent.objects.filter(order__in=orders, to_status=Order.STATUS_PAID).count() == 2
+
+
+@pytest.mark.django_db
+def test_pay_orders_bulk_tolerates_event_insert_failure():
+    from unittest.mock import patch
+
+    from orders.services import pay_orders_bulk
+
+    user = UserFactory()
+    order = Order.objects.create(user=user)
+    with patch("orders.services.OrderStatusEvent.objects.bulk_create", side_effect=Exception("db down")):
+        updated = pay_orders_bulk([order])
+    assert updated[0].status == Order.STATUS_PAID
+    assert not OrderStatusEvent.objects.filter(order=order).exists()
+
+
+@pytest.mark.django_db
+def test_pay_orders_bulk_persists_events_when_one_order_raises():
+    from orders.services import pay_orders_bulk
+
+    user = UserFactory()
+    good = Order.objects.create(user=user)
+    cancelled = Order.objects.create(user=user, status=Order.STATUS_CANCELLED)
+
+    with pytest.raises(ValueError):
+        pay_orders_bulk([good, cancelled])
+    # The order paid before the failure keeps its audit event
+    assert OrderStatusEvent.objects.filter(order=good, to_status=Order.STATUS_PAID).count() == 1
+
+
+@pytest.mark.django_db
+def test_pay_orders_bulk_no_events_for_empty_batch():
+    from orders.services import pay_orders_bulk
+
+    assert pay_orders_bulk([]) == []
+    assert OrderStatusEvent.objects.count() == 0
+
+
+@pytest.mark.django_db
+def test_pay_order_sends_email_through_outbox(settings):
+    from orders.services import pay_order
+
+    settings.EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
+    user = UserFactory()
+    order = Order.objects.create(user=user, email="buyer@example.com")
+    pay_order(order)
+    assert len(mail.outbox) == 1
+    assert not OrderOutbox.objects.filter(processed_at__isnull=True).exists()
+
+
+@pytest.mark.django_db
+def test_outbox_defers_email_until_drained_when_not_eager(settings):
+    from orders.services import pay_order
+
+    settings.EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
+    settings.ORDERS_OUTBOX_EAGER = False
+    user = UserFactory()
+    order = Order.objects.create(user=user, email="buyer@example.com")
+    pay_order(order)
+    assert len(mail.outbox) == 0
+    assert OrderOutbox.objects.filter(processed_at__isnull=True).count() == 1
+
+    assert process_order_outbox() == 1
+    assert len(mail.outbox) == 1
+    # Nothing left pending; a second drain is a no-op
+    assert process_order_outbox() == 0
+
+
+@pytest.mark.django_db
+def test_outbox_drops_unknown_topics_and_missing_orders(settings):
+    settings.EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
+    OrderOutbox.objects.create(topic="unknown.topic", payload={})
+    OrderOutbox.objects.create(topic=OrderOutbox.TOPIC_ORDER_PAID, payload={"order_id": 999999})
+    assert process_order_outbox() == 2
+    assert len(mail.outbox) == 0
+    assert not OrderOutbox.objects.filter(processed_at__isnull=True).exists()
+
+
+@pytest.mark.django_db
+def test_outbox_releases_claim_when_dispatch_fails(settings):
+    from unittest.mock import patch
+
+    settings.EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
+    settings.ORDERS_OUTBOX_EAGER = False
+    user = UserFactory()
+    order = Order.objects.create(user=user)
+    OrderOutbox.objects.create(topic=OrderOutbox.TOPIC_ORDER_PAID, payload={"order_id": order.id})
+
+    with patch("orders.services.send_order_paid_email", side_effect=Exception("smtp down")):
+        assert process_order_outbox() == 0
+    # Failed dispatch releases the claim instead of losing the email
+    assert OrderOutbox.objects.filter(processed_at__isnull=True).count() == 1
+
+    assert process_order_outbox() == 1
+    assert len(mail.outbox) == 1
+
+
+@pytest.mark.django_db
+def test_cancel_order_defers_event_when_requested():
+    from orders.services import cancel_order
+
+    user = UserFactory()
+    order = Order.objects.create(user=user)
+    events = []
+    cancel_order(order, defer_events=events)
+    assert order.status == Order.STATUS_CANCELLED
+    assert len(events) == 1 and events[0].pk is None
+    OrderStatusEvent.objects.bulk_create(events)
+    assert OrderStatusEvent.objects.filter(order=order, to_status=Order.STATUS_CANCELLED).count() == 1
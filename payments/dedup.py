@@ -0,0 +1,28 @@
+"""Short-term duplicate suppression for webhook payloads.
+
+Fronts the database with the configured Django cache: replayed payloads
+(Paystack retries the same body on timeouts) are answered from a seen-hash
+lookup before any JSON parsing or intent SELECT. The durable
+``last_webhook_hash`` check on the intent row remains the fallback, so a
+cache eviction or process restart only costs one extra DB round trip,
+never a missed event.
+"""
+
+from django.core.cache import cache
+
+# Long enough to cover Paystack's retry window; entries expire on their own
+SEEN_TTL = 60 * 60
+
+_KEY_PREFIX = "payments:webhook:seen:"
+
+
+def seen(payload_hash: str) -> bool:
+    """Return True if this payload hash was recently processed."""
+
+    return cache.get(_KEY_PREFIX + payload_hash) is not None
+
+
+def mark_seen(payload_hash: str) -> None:
+    """Record a processed payload hash for the retry window."""
+
+    cache.set(_KEY_PREFIX + payload_hash, 1, SEEN_TTL)
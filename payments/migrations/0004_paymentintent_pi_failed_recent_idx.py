@@ -0,0 +1,18 @@
+# Generated by Django 5.2.17 on 2026-08-28 03:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0009_postgres_idempotency_inflight_index'),
+        ('payments', '0003_rename_payments_pa_order_i_e6141c_idx_payments_pa_order_i_f92a4d_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='paymentintent',
+            index=models.Index(condition=models.Q(('status', 'failed')), fields=['-created_at'], name='pi_failed_recent_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.17 on 2026-08-28 03:55
+
+import django.db.models.functions.text
+from django.db import migrations, models
+from django.db.models.functions import Lower, Upper
+
+
+def normalize_casing(apps, schema_editor):
+    """Backfill any rows written before normalization moved out of save()."""
+    PaymentIntent = apps.get_model("payments", "PaymentIntent")
+    PaymentIntent.objects.update(currency=Upper("currency"), provider=Lower("provider"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0011_orderoutbox'),
+        ('payments', '0004_paymentintent_pi_failed_recent_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_casing, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='paymentintent',
+            constraint=models.CheckConstraint(condition=models.Q(('currency', django.db.models.functions.text.Upper('currency'))), name='paymentintent_currency_upper'),
+        ),
+        migrations.AddConstraint(
+            model_name='paymentintent',
+            constraint=models.CheckConstraint(condition=models.Q(('provider', django.db.models.functions.text.Lower('provider'))), name='paymentintent_provider_lower'),
+        ),
+    ]
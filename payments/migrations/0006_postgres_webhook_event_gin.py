@@ -0,0 +1,52 @@
+from django.db import migrations
+
+
+def forwards(apps, schema_editor):
+    # Apply only on PostgreSQL: webhook_event/metadata are already stored as
+    # jsonb there, so audit lookups by payload keys (event ids, references)
+    # get jsonb_path_ops GIN indexes instead of sequential scans. Other
+    # vendors keep the plain JSON columns.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    statements = [
+        (
+            "CREATE INDEX IF NOT EXISTS pi_webhook_gin ON payments_paymentintent "
+            "USING gin (webhook_event jsonb_path_ops)"
+        ),
+        ("CREATE INDEX IF NOT EXISTS pi_metadata_gin ON payments_paymentintent USING gin (metadata jsonb_path_ops)"),
+    ]
+
+    cursor = schema_editor.connection.cursor()
+    try:
+        for sql in statements:
+            cursor.execute(sql)
+    finally:
+        cursor.close()
+
+
+def backwards(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    statements = [
+        "DROP INDEX IF EXISTS pi_metadata_gin",
+        "DROP INDEX IF EXISTS pi_webhook_gin",
+    ]
+
+    cursor = schema_editor.connection.cursor()
+    try:
+        for sql in statements:
+            cursor.execute(sql)
+    finally:
+        cursor.close()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("payments", "0005_paymentintent_paymentintent_currency_upper_and_more"),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
@@ -9,6 +9,7 @@ from common.choices import Currency, PaymentIntentStatus, PaymentProvider
 from common.models import TimeStampedModel
 from django.core.validators import MinValueValidator
 from django.db import models
+from django.db.models.functions import Lower, Upper
 
 
 class PaymentIntent(TimeStampedModel):
@@ -57,18 +58,23 @@ class PaymentIntent(TimeStampedModel):
         ordering = ["-id"]
         indexes = [
             models.Index(fields=["order", "status", "created_at"]),
+            # Serves the recent-failed listing as a bounded index scan;
+            # failed intents are a small minority of rows.
+            models.Index(
+                fields=["-created_at"],
+                name="pi_failed_recent_idx",
+                condition=models.Q(status=PaymentIntentStatus.FAILED),
+            ),
         ]
         constraints = [
             models.CheckConstraint(condition=models.Q(amount__gte=0), name="paymentintent_amount_non_negative"),
+            # Casing is normalized at the input boundaries (serializers and
+            # create_or_update_intent); the constraints make the DB reject
+            # writes that slip past them, including bulk paths save() never
+            # sees.
+            models.CheckConstraint(condition=models.Q(currency=Upper("currency")), name="paymentintent_currency_upper"),
+            models.CheckConstraint(condition=models.Q(provider=Lower("provider")), name="paymentintent_provider_lower"),
         ]
 
     def __str__(self) -> str:  # pragma: no cover
         return f"PaymentIntent#{self.id} order={self.order_id} ref={self.reference} status={self.status}"
-
-    def save(self, *args, **kwargs):
-        # Normalize to match choices and avoid inconsistent casing
-        if self.currency:
-            self.currency = self.currency.upper()
-        if self.provider:
-            self.provider = self.provider.lower()
-        super().save(*args, **kwargs)
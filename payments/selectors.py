@@ -7,19 +7,51 @@ from __future__ import annotations
 
 from typing import Optional
 
+from django.core.cache import cache
 from django.db.models import QuerySet
 from payments.models import PaymentIntent
 
+# Paystack retries webhooks for the same reference within seconds; a short
+# TTL serves those retries from cache while bounding staleness. Writers
+# invalidate explicitly, so the TTL is only a backstop.
+INTENT_CACHE_TTL = 60
+
+
+def _intent_cache_key(reference: str) -> str:
+    return f"pi:ref:{reference}"
+
+
+def invalidate_intent_cache(reference: str) -> None:
+    """Drop the cached intent for `reference` after a write."""
+
+    if reference:
+        cache.delete(_intent_cache_key(reference))
+
 
 def get_intent_by_reference(reference: str) -> Optional[PaymentIntent]:
     """Return a single `PaymentIntent` by its `reference`, or None.
 
-    Uses `select_related('order')` because most flows need order context.
+    Serves repeat lookups (duplicate webhooks, status polling) from a
+    short-TTL cache. Uses `select_related('order__user')` because most
+    flows need order and customer context; `webhook_event` is deferred
+    since the hot paths only ever write it.
     """
 
     if not reference:
         return None
-    return PaymentIntent.objects.select_related("order").filter(reference=reference).first()
+    key = _intent_cache_key(reference)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+    intent = (
+        PaymentIntent.objects.select_related("order", "order__user")
+        .defer("webhook_event")
+        .filter(reference=reference)
+        .first()
+    )
+    if intent is not None:
+        cache.set(key, intent, INTENT_CACHE_TTL)
+    return intent
 
 
 def list_intents_for_order(order_id: int, status: Optional[str] = None) -> QuerySet[PaymentIntent]:
@@ -28,7 +60,11 @@ def list_intents_for_order(order_id: int, status: Optional[str] = None) -> Query
     Returns a queryset respecting model ordering (newest first).
     """
 
-    qs = PaymentIntent.objects.select_related("order").filter(order_id=order_id)
+    qs = (
+        PaymentIntent.objects.select_related("order", "order__user")
+        .defer("metadata", "webhook_event")
+        .filter(order_id=order_id)
+    )
     if status:
         qs = qs.filter(status=status)
     return qs
@@ -41,7 +77,10 @@ def list_recent_failed_intents(limit: int = 20) -> QuerySet[PaymentIntent]:
     """
 
     qs = (
-        PaymentIntent.objects.select_related("order").filter(status=PaymentIntent.STATUS_FAILED).order_by("-created_at")
+        PaymentIntent.objects.select_related("order", "order__user")
+        .defer("metadata", "webhook_event")
+        .filter(status=PaymentIntent.STATUS_FAILED)
+        .order_by("-created_at")
     )
     # Slice for a LIMIT-like effect while still returning a queryset for chaining.
     return qs[:limit]
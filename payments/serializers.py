@@ -22,7 +22,7 @@ class PaystackInitializeSerializer(serializers.Serializer):
     - reference: optional custom reference; sensible default applied in view
     """
 
-    order_id = serializers.IntegerField()
+    order_id = serializers.IntegerField(min_value=1)
     amount = serializers.DecimalField(max_digits=12, decimal_places=2, required=False)
     currency = serializers.CharField(required=False, default=Currency.NGN)
     reference = serializers.CharField(max_length=64, required=False, allow_blank=True)
@@ -44,7 +44,7 @@ class PaystackInitializeSerializer(serializers.Serializer):
 class PaymentIntentUpsertSerializer(serializers.Serializer):
     """Create or update a PaymentIntent by reference with enums."""
 
-    order_id = serializers.IntegerField(required=True)
+    order_id = serializers.IntegerField(required=True, min_value=1)
     reference = serializers.CharField(required=True, max_length=64)
     amount = serializers.DecimalField(max_digits=12, decimal_places=2, required=False)
     currency = serializers.ChoiceField(choices=Currency.choices, default=Currency.NGN)
@@ -60,7 +60,11 @@ class PaymentIntentUpsertSerializer(serializers.Serializer):
 
 
 class PaymentIntentSerializer(serializers.ModelSerializer):
-    """Read serializer exposing intent state and enums."""
+    """Read serializer exposing intent state and enums.
+
+    Responses are rendered by `_serialize_intent_fast` below; this class
+    remains the OpenAPI schema source referenced from the views.
+    """
 
     order_id = serializers.IntegerField(read_only=True)
 
@@ -79,3 +83,38 @@ class PaymentIntentSerializer(serializers.ModelSerializer):
             "created_at",
             "updated_at",
         )
+
+
+_AMOUNT_EXP = Decimal("0.01")
+
+
+def _iso_datetime(value) -> str:
+    s = value.isoformat()
+    if s.endswith("+00:00"):
+        s = s[:-6] + "Z"
+    return s
+
+
+def _serialize_intent_fast(intent: PaymentIntent) -> dict:
+    """Render an intent to the exact dict PaymentIntentSerializer produces.
+
+    ModelSerializer walks every field through bound-field machinery per
+    response; for this flat, read-only shape a hand-built dict does the
+    same job in a fraction of the time. Kept next to the serializer so
+    field changes update both together.
+    """
+
+    amount = intent.amount
+    return {
+        "reference": intent.reference,
+        "order_id": intent.order_id,
+        "provider": intent.provider,
+        "amount": None if amount is None else f"{amount.quantize(_AMOUNT_EXP):f}",
+        "currency": intent.currency,
+        "status": intent.status,
+        "authorization_url": intent.authorization_url,
+        "access_code": intent.access_code,
+        "metadata": intent.metadata,
+        "created_at": _iso_datetime(intent.created_at),
+        "updated_at": _iso_datetime(intent.updated_at),
+    }
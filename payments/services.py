@@ -4,17 +4,19 @@ Implements Paystack initialization, verification, signature validation,
 and order finalization logic coordinated via PaymentIntent.
 """
 
-import hashlib
 import hmac
 import logging
 from decimal import Decimal
+from functools import lru_cache
 from typing import Dict, Optional, Tuple
 
 import httpx
 from common.choices import Currency, PaymentProvider
 from django.conf import settings
+from django.db import connections
 from orders.services import pay_order
 from payments.models import PaymentIntent
+from payments.selectors import invalidate_intent_cache
 
 # Use a dedicated payments logger to align with production logging config
 logger = logging.getLogger("avthrift.payments")
@@ -25,20 +27,59 @@ except Exception:  # pragma: no cover
     sentry_sdk = None  # type: ignore
 
 
+@lru_cache(maxsize=1)
+def _paystack_client() -> httpx.Client:
+    """Shared HTTP client for Paystack API calls.
+
+    Reusing one client keeps connections alive across requests, so repeat
+    calls skip the TCP/TLS handshake. Built lazily so tests never open a
+    real connection pool.
+    """
+
+    return httpx.Client(
+        timeout=15,
+        limits=httpx.Limits(max_keepalive_connections=20, max_connections=50),
+    )
+
+
+def _post(url: str, *, headers: Optional[dict] = None, json: Optional[dict] = None) -> httpx.Response:
+    return _paystack_client().post(url, headers=headers, json=json)
+
+
+def _get(url: str, *, headers: Optional[dict] = None) -> httpx.Response:
+    return _paystack_client().get(url, headers=headers)
+
+
+# Decimal places per currency; NGN/GHS/USD all carry two. Extend here if
+# supporting zero-decimal or different subunit currencies later.
+_MINOR_UNIT_PLACES = {Currency.NGN: 2, Currency.GHS: 2, Currency.USD: 2}
+
+
 def _to_minor_units(amount: Decimal, currency: str) -> int:
     """Convert a decimal amount in major units to minor units (integer).
 
-    Uses 100 as default multiplier; NGN/GHS/USD all use 100. Adjust here if
-    supporting zero-decimal or different subunit currencies later.
+    Works on the Decimal's digit tuple directly: shifting the exponent is
+    plain int arithmetic, an order of magnitude cheaper than Decimal
+    multiplication on the webhook hot path.
     """
 
     if amount is None:
         return 0
     # Use Currency enums to drive mapping to avoid free-form strings
     code = (currency or Currency.NGN).upper()
-    multipliers = {Currency.NGN: 100, Currency.GHS: 100, Currency.USD: 100}
-    m = multipliers.get(code, 100)
-    return int(Decimal(amount) * Decimal(m))
+    places = _MINOR_UNIT_PLACES.get(code, 2)
+    if not isinstance(amount, Decimal):
+        amount = Decimal(amount)
+    sign, digits, exponent = amount.as_tuple()
+    value = 0
+    for d in digits:
+        value = value * 10 + d
+    shift = exponent + places
+    if shift >= 0:
+        value *= 10**shift
+    else:
+        value //= 10**-shift
+    return -value if sign else value
 
 
 def create_or_update_intent(
@@ -52,21 +93,47 @@ def create_or_update_intent(
     access_code: Optional[str] = None,
     metadata: Optional[dict] = None,
 ) -> PaymentIntent:
-    """Create or update a PaymentIntent for the given order and reference."""
+    """Create or update a PaymentIntent for the given order and reference.
+
+    Uses a single upsert (INSERT ... ON CONFLICT (reference) DO UPDATE)
+    instead of update_or_create's SELECT-then-write, saving a round-trip
+    and closing the race between the probe and the write. The upsert
+    bypasses ``save()``, so currency/provider normalization happens here.
+    """
 
-    intent, _created = PaymentIntent.objects.update_or_create(
+    update_fields = [
+        "order",
+        "amount",
+        "currency",
+        "provider",
+        "authorization_url",
+        "access_code",
+        "status",
+        "metadata",
+        "updated_at",
+    ]
+    intent = PaymentIntent(
         reference=reference,
-        defaults={
-            "order": order,
-            "amount": amount,
-            "currency": currency,
-            "provider": (provider or PaymentProvider.PAYSTACK),
-            "authorization_url": authorization_url or "",
-            "access_code": access_code or "",
-            "status": PaymentIntent.STATUS_INITIALIZED,
-            "metadata": metadata or {},
-        },
+        order=order,
+        amount=amount,
+        currency=(currency or "").upper(),
+        provider=(provider or PaymentProvider.PAYSTACK).lower(),
+        authorization_url=authorization_url or "",
+        access_code=access_code or "",
+        status=PaymentIntent.STATUS_INITIALIZED,
+        metadata=metadata or {},
+    )
+    # MySQL's ON DUPLICATE KEY UPDATE cannot name the conflict target
+    supports_target = connections[PaymentIntent.objects.db].features.supports_update_conflicts_with_target
+    [intent] = PaymentIntent.objects.bulk_create(
+        [intent],
+        update_conflicts=True,
+        update_fields=update_fields,
+        unique_fields=["reference"] if supports_target else None,
     )
+    if intent.pk is None:  # pragma: no cover - backends without RETURNING
+        intent = PaymentIntent.objects.get(reference=reference)
+    invalidate_intent_cache(reference)
     return intent
 
 
@@ -96,7 +163,7 @@ def initialize_paystack_transaction(
         "metadata": metadata or {},
     }
 
-    r = httpx.post(url, headers=headers, json=payload, timeout=15)
+    r = _post(url, headers=headers, json=payload)
     data = r.json()
     if r.status_code != 200 or not data.get("status"):
         logger.error(
@@ -137,18 +204,39 @@ def verify_paystack_transaction(*, reference: str) -> Dict:
     base_url = getattr(settings, "PAYSTACK_BASE_URL", "https://api.paystack.co")
     url = f"{base_url}/transaction/verify/{reference}"
     headers = {"Authorization": f"Bearer {settings.PAYSTACK_SECRET_KEY}"}
-    r = httpx.get(url, headers=headers, timeout=15)
+    r = _get(url, headers=headers)
     return r.json()
 
 
+@lru_cache(maxsize=4)
+def _secret_bytes(secret: str) -> bytes:
+    """Secret key encoded once per secret rather than once per webhook.
+
+    Keyed on the secret so key rotation (and per-test overrides) get
+    fresh bytes.
+    """
+
+    return secret.encode("utf-8")
+
+
 def validate_paystack_signature(raw_body: bytes, signature: str) -> bool:
-    """Validate webhook signature using Paystack secret key (HMAC SHA512)."""
+    """Validate webhook signature using Paystack secret key (HMAC SHA512).
+
+    Uses the one-shot ``hmac.digest`` fast path, which stays in C for the
+    whole keying-plus-body computation instead of building an HMAC object
+    per request.
+    """
 
-    if not signature:
+    # A hex-encoded SHA-512 digest is always 128 chars; rejecting malformed
+    # headers up front avoids hashing the body for random probe traffic.
+    if not signature or len(signature) != 128:
+        return False
+    try:
+        sig_bytes = bytes.fromhex(signature)
+    except ValueError:
         return False
-    secret = settings.PAYSTACK_SECRET_KEY.encode("utf-8")
-    digest = hmac.new(secret, msg=raw_body, digestmod=hashlib.sha512).hexdigest()
-    return hmac.compare_digest(signature, digest)
+    expected = hmac.digest(_secret_bytes(settings.PAYSTACK_SECRET_KEY), raw_body, "sha512")
+    return hmac.compare_digest(expected, sig_bytes)
 
 
 def finalize_intent_and_order(*, intent: PaymentIntent, event: Dict) -> None:
@@ -181,15 +269,18 @@ def finalize_intent_and_order(*, intent: PaymentIntent, event: Dict) -> None:
                 sentry_sdk.capture_message("paystack_amount_mismatch", level="warning")
             except Exception:
                 pass
-        # Persist webhook for audit, but do not mark success
+        # Persist webhook for audit, but do not mark success; metadata is
+        # included so the caller's staged dedup hash lands in the same UPDATE
         intent.webhook_event = event
         intent.status = PaymentIntent.STATUS_FAILED
-        intent.save(update_fields=["webhook_event", "status", "updated_at"])
+        intent.save(update_fields=["webhook_event", "status", "metadata", "updated_at"])
+        invalidate_intent_cache(intent.reference)
         return
 
     intent.webhook_event = event
     intent.status = PaymentIntent.STATUS_SUCCEEDED
-    intent.save(update_fields=["webhook_event", "status", "updated_at"])
+    intent.save(update_fields=["webhook_event", "status", "metadata", "updated_at"])
+    invalidate_intent_cache(intent.reference)
 
     try:
         pay_order(intent.order)
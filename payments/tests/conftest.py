@@ -0,0 +1,79 @@
+"""Shared fixtures for the payments test suite.
+
+Database reuse is configured globally in pyproject.toml (`--reuse-db
+--nomigrations`); run with `--create-db` after schema changes.
+
+Plain `pytest.mark.django_db` already wraps each test in a rolled-back
+transaction (TestCase semantics); the expensive flush-between-tests path
+only kicks in with `transaction=True`, which no test here requests. Keep
+it that way unless a test genuinely exercises commit hooks.
+"""
+
+from decimal import Decimal
+
+import pytest
+from cart.tests.factories import UserFactory
+from catalog.tests.factories import ProductVariantFactory
+from django.core.cache import cache
+from orders.models import Order, OrderItem
+from rest_framework.test import APIClient
+
+
+@pytest.fixture(autouse=True)
+def _isolate_cache():
+    """Keep the locmem cache from leaking cached intents between tests.
+
+    The database rolls back per test but the process-level cache does not,
+    so cached rows would otherwise outlive the rows they were built from.
+    """
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def user(db):
+    return UserFactory()
+
+
+@pytest.fixture
+def api_client():
+    """Unauthenticated API client, one per test instead of one per call site."""
+    return APIClient()
+
+
+@pytest.fixture
+def auth_client(api_client, user):
+    """API client authenticated as the `user` fixture.
+
+    force_authenticate is deliberate: it bypasses authentication, so each
+    request skips the JWT decode plus user lookup a real Bearer header
+    would pay, and no token has to outlive the per-test DB rollback.
+    """
+    api_client.force_authenticate(user=user)
+    yield api_client
+    api_client.force_authenticate(user=None)
+
+
+@pytest.fixture
+def make_order_with_item(db):
+    """Factory fixture: an order with one 2 x 25.00 line item.
+
+    Accepts an optional owner so ownership tests can build orders for a
+    second user; defaults to a fresh one.
+    """
+
+    def _make(user=None):
+        owner = user or UserFactory()
+        order = Order.objects.create(user=owner, email=owner.email)
+        variant = ProductVariantFactory(price=Decimal("25.00"))
+        OrderItem.objects.create(
+            order=order,
+            variant=variant,
+            product_title=variant.product.title,
+            variant_sku=variant.sku,
+            quantity=2,
+            unit_price=Decimal("25.00"),
+        )
+        return order
+
+    return _make
@@ -0,0 +1,48 @@
+"""Plain helpers shared across the payments test modules.
+
+Unlike conftest.py this module is imported explicitly, so it carries
+anything that is not a fixture: URL builders, fakes, and the like.
+"""
+
+import hashlib
+import hmac
+
+from django.urls import reverse
+
+
+def intent_detail_url(reference: str) -> str:
+    """Resolve the payment-intent detail URL through the named route."""
+
+    return reverse("payments:payment-intent-detail", kwargs={"reference": reference})
+
+
+class FakePaystackResponse:
+    """Canned stand-in for an httpx.Response from the Paystack API.
+
+    Shared here so service-level tests stop declaring one-off Resp/RespBad
+    classes inline.
+    """
+
+    def __init__(self, status_code=200, body=None):
+        self.status_code = status_code
+        self._body = body if body is not None else {"status": True, "data": {}}
+
+    def json(self):
+        return self._body
+
+
+def signature_table(secret: bytes, bodies: tuple) -> dict:
+    """Hex HMAC-SHA512 signatures for a set of static webhook bodies.
+
+    Signed once at import by the test modules instead of once per request
+    in the test bodies. One key schedule per secret; each signature copies
+    the keyed state and only pays for the body compression.
+    """
+
+    base = hmac.new(secret, b"", hashlib.sha512)
+    sigs = {}
+    for body in bodies:
+        h = base.copy()
+        h.update(body)
+        sigs[body] = h.hexdigest()
+    return sigs
@@ -29,7 +29,7 @@ def test_initialize_idempotency_conflict_returns_409(monkeypatch, settings):
     def fake_post(url, headers=None, json=None, timeout=None):
         return DummyResp()
 
-    monkeypatch.setattr("httpx.post", fake_post)
+    monkeypatch.setattr("payments.services._post", fake_post)
 
     user = UserFactory()
     client = APIClient()
@@ -3,18 +3,13 @@ from decimal import Decimal
 import pytest
 from cart.tests.factories import UserFactory
 from common.choices import Currency
-from django.urls import reverse
 from orders.models import Order
 from payments.models import PaymentIntent
-from rest_framework.test import APIClient
+from payments.tests.helpers import intent_detail_url
 
 
 @pytest.mark.django_db
-def test_intent_detail_owner_can_access():
-    user = UserFactory()
-    client = APIClient()
-    client.force_authenticate(user=user)
-
+def test_intent_detail_owner_can_access(auth_client, user):
     order = Order.objects.create(user=user, email=getattr(user, "email", None))
     intent = PaymentIntent.objects.create(
         order=order,
@@ -23,8 +18,7 @@ def test_intent_detail_owner_can_access():
         currency=Currency.NGN,
     )
 
-    url = reverse("payments:payment-intent-detail", kwargs={"reference": intent.reference})
-    r = client.get(url)
+    r = auth_client.get(intent_detail_url(intent.reference))
 
     assert r.status_code == 200
     body = r.json()
@@ -33,11 +27,8 @@ def test_intent_detail_owner_can_access():
 
 
 @pytest.mark.django_db
-def test_intent_detail_other_user_gets_404():
+def test_intent_detail_other_user_gets_404(auth_client):
     owner = UserFactory()
-    other = UserFactory()
-    client = APIClient()
-    client.force_authenticate(user=other)
 
     order = Order.objects.create(user=owner, email=getattr(owner, "email", None))
     intent = PaymentIntent.objects.create(
@@ -47,15 +38,14 @@ def test_intent_detail_other_user_gets_404():
         currency=Currency.NGN,
     )
 
-    url = reverse("payments:payment-intent-detail", kwargs={"reference": intent.reference})
-    r = client.get(url)
+    r = auth_client.get(intent_detail_url(intent.reference))
 
     assert r.status_code == 404
     assert r.json()["detail"] == "Intent not found"
 
 
 @pytest.mark.django_db
-def test_intent_detail_unauthenticated_gets_401():
+def test_intent_detail_unauthenticated_gets_401(api_client):
     owner = UserFactory()
     order = Order.objects.create(user=owner, email=getattr(owner, "email", None))
     intent = PaymentIntent.objects.create(
@@ -65,9 +55,7 @@ def test_intent_detail_unauthenticated_gets_401():
         currency=Currency.NGN,
     )
 
-    client = APIClient()  # no auth
-    url = reverse("payments:payment-intent-detail", kwargs={"reference": intent.reference})
-    r = client.get(url)
+    r = api_client.get(intent_detail_url(intent.reference))
 
     assert r.status_code in (401, 403)
     # DRF typically returns 401 for IsAuthenticated without credentials
@@ -7,15 +7,13 @@ from common.choices import Currency, PaymentProvider
 from django.urls import reverse
 from orders.models import Order, OrderItem
 from payments.models import PaymentIntent
-from rest_framework.test import APIClient
 
+# Resolved once per module; every test posts to the same route
+UPSERT_URL = reverse("payments:payment-intent-upsert")
 
-@pytest.mark.django_db
-def test_upsert_creates_intent_and_computes_amount():
-    user = UserFactory()
-    client = APIClient()
-    client.force_authenticate(user=user)
 
+@pytest.mark.django_db
+def test_upsert_creates_intent_and_computes_amount(auth_client, user):
     order = Order.objects.create(user=user, email=getattr(user, "email", None))
     variant = ProductVariantFactory()
     OrderItem.objects.create(
@@ -27,9 +25,8 @@ def test_upsert_creates_intent_and_computes_amount():
         unit_price=Decimal("25.00"),
     )
 
-    url = reverse("payments:payment-intent-upsert")
     payload = {"order_id": order.id, "reference": "ORD-{}-PAY".format(order.id)}
-    r = client.post(url, payload, format="json")
+    r = auth_client.post(UPSERT_URL, payload, format="json")
 
     assert r.status_code == 200
     body = r.json()
@@ -41,21 +38,16 @@ def test_upsert_creates_intent_and_computes_amount():
 
 
 @pytest.mark.django_db
-def test_upsert_respects_explicit_amount():
-    user = UserFactory()
-    client = APIClient()
-    client.force_authenticate(user=user)
-
+def test_upsert_respects_explicit_amount(auth_client, user):
     order = Order.objects.create(user=user, email=getattr(user, "email", None))
 
-    url = reverse("payments:payment-intent-upsert")
     payload = {
         "order_id": order.id,
         "reference": "ORD-{}-PAY".format(order.id),
         "amount": "12.34",
         "currency": Currency.USD,
     }
-    r = client.post(url, payload, format="json")
+    r = auth_client.post(UPSERT_URL, payload, format="json")
 
     assert r.status_code == 200
     intent = PaymentIntent.objects.get(reference=payload["reference"])
@@ -64,16 +56,11 @@ def test_upsert_respects_explicit_amount():
 
 
 @pytest.mark.django_db
-def test_upsert_invalid_currency_choice():
-    user = UserFactory()
-    client = APIClient()
-    client.force_authenticate(user=user)
-
+def test_upsert_invalid_currency_choice(auth_client, user):
     order = Order.objects.create(user=user, email=getattr(user, "email", None))
 
-    url = reverse("payments:payment-intent-upsert")
     payload = {"order_id": order.id, "reference": "ORD-{}-PAY".format(order.id), "currency": "EUR"}
-    r = client.post(url, payload, format="json")
+    r = auth_client.post(UPSERT_URL, payload, format="json")
 
     assert r.status_code == 400
     # View wraps serializer errors into a generic message
@@ -81,38 +68,29 @@ def test_upsert_invalid_currency_choice():
 
 
 @pytest.mark.django_db
-def test_upsert_invalid_provider_choice():
-    user = UserFactory()
-    client = APIClient()
-    client.force_authenticate(user=user)
-
+def test_upsert_invalid_provider_choice(auth_client, user):
     order = Order.objects.create(user=user, email=getattr(user, "email", None))
 
-    url = reverse("payments:payment-intent-upsert")
     payload = {
         "order_id": order.id,
         "reference": "ORD-{}-PAY".format(order.id),
         "provider": "stripe",  # unsupported provider
     }
-    r = client.post(url, payload, format="json")
+    r = auth_client.post(UPSERT_URL, payload, format="json")
 
     assert r.status_code == 400
     assert r.json()["detail"] == "Invalid payload"
 
 
 @pytest.mark.django_db
-def test_upsert_order_not_owned_returns_404():
+def test_upsert_order_not_owned_returns_404(auth_client):
     # authenticated user tries to upsert intent for someone else's order
     owner = UserFactory()
-    other_user = UserFactory()
-    client = APIClient()
-    client.force_authenticate(user=other_user)
 
     order = Order.objects.create(user=owner, email=getattr(owner, "email", None))
 
-    url = reverse("payments:payment-intent-upsert")
     payload = {"order_id": order.id, "reference": "ORD-{}-PAY".format(order.id)}
-    r = client.post(url, payload, format="json")
+    r = auth_client.post(UPSERT_URL, payload, format="json")
 
     assert r.status_code == 404
     assert r.json()["detail"] == "Order not found"
@@ -1,12 +1,16 @@
-"""Minimal test covering the payments health endpoint."""
+"""Minimal test covering the payments health endpoint.
+
+Deliberately carries no ``django_db`` mark: pytest-django blocks DB
+access for unmarked tests, so this stays a pure view test with no
+connection setup.
+"""
 
 from django.urls import reverse
-from rest_framework.test import APIClient
+
+HEALTH_URL = reverse("payments:payments-health")
 
 
-def test_payments_health_ok():
-    client = APIClient()
-    url = reverse("payments:payments-health")
-    resp = client.get(url)
+def test_payments_health_ok(api_client):
+    resp = api_client.get(HEALTH_URL)
     assert resp.status_code == 200
     assert resp.json() == {"status": "ok"}
@@ -4,6 +4,7 @@ from decimal import Decimal
 import pytest
 from cart.tests.factories import UserFactory
 from common.choices import Currency
+from django.db.models import Case, Value, When
 from django.utils import timezone
 from orders.models import Order
 from payments.models import PaymentIntent
@@ -32,9 +33,13 @@ def test_list_intents_for_order_filters_by_status():
     order = Order.objects.create(user=user, email=getattr(user, "email", None))
     other_order = Order.objects.create(user=user, email=getattr(user, "email", None))
 
-    a = PaymentIntent.objects.create(order=order, reference="SEL-F-1", amount=Decimal("1.00"), currency=Currency.NGN)
-    b = PaymentIntent.objects.create(order=order, reference="SEL-F-2", amount=Decimal("2.00"), currency=Currency.NGN)
-    PaymentIntent.objects.create(order=other_order, reference="SEL-F-3", amount=Decimal("3.00"), currency=Currency.NGN)
+    a, b, _ = PaymentIntent.objects.bulk_create(
+        [
+            PaymentIntent(order=order, reference="SEL-F-1", amount=Decimal("1.00"), currency=Currency.NGN),
+            PaymentIntent(order=order, reference="SEL-F-2", amount=Decimal("2.00"), currency=Currency.NGN),
+            PaymentIntent(order=other_order, reference="SEL-F-3", amount=Decimal("3.00"), currency=Currency.NGN),
+        ]
+    )
 
     # mark one failed
     b.status = PaymentIntent.STATUS_FAILED
@@ -55,20 +60,49 @@ def test_list_recent_failed_intents_orders_by_created_at_and_limits():
     order = Order.objects.create(user=user, email=getattr(user, "email", None))
 
     now = timezone.now()
-    i1 = PaymentIntent.objects.create(order=order, reference="FAIL-1", amount=Decimal("1.00"), currency=Currency.NGN)
-    i2 = PaymentIntent.objects.create(order=order, reference="FAIL-2", amount=Decimal("2.00"), currency=Currency.NGN)
-    i3 = PaymentIntent.objects.create(order=order, reference="FAIL-3", amount=Decimal("3.00"), currency=Currency.NGN)
-
-    for i in (i1, i2, i3):
-        i.status = PaymentIntent.STATUS_FAILED
-        i.save(update_fields=["status"])
+    i1, i2, i3 = PaymentIntent.objects.bulk_create(
+        [
+            PaymentIntent(order=order, reference="FAIL-1", amount=Decimal("1.00"), currency=Currency.NGN),
+            PaymentIntent(order=order, reference="FAIL-2", amount=Decimal("2.00"), currency=Currency.NGN),
+            PaymentIntent(order=order, reference="FAIL-3", amount=Decimal("3.00"), currency=Currency.NGN),
+        ]
+    )
 
-    # Stagger created_at to control ordering
-    PaymentIntent.objects.filter(pk=i1.pk).update(created_at=now - timedelta(minutes=3))
-    PaymentIntent.objects.filter(pk=i2.pk).update(created_at=now - timedelta(minutes=2))
-    PaymentIntent.objects.filter(pk=i3.pk).update(created_at=now - timedelta(minutes=1))
+    # Fail all three and stagger created_at to control ordering, in two
+    # set-based statements instead of one round trip per row
+    PaymentIntent.objects.filter(pk__in=[i1.pk, i2.pk, i3.pk]).update(status=PaymentIntent.STATUS_FAILED)
+    PaymentIntent.objects.filter(pk__in=[i1.pk, i2.pk, i3.pk]).update(
+        created_at=Case(
+            When(pk=i1.pk, then=Value(now - timedelta(minutes=3))),
+            When(pk=i2.pk, then=Value(now - timedelta(minutes=2))),
+            default=Value(now - timedelta(minutes=1)),
+        )
+    )
 
     qs = list_recent_failed_intents(limit=2)
     refs = [i.reference for i in qs]
     # Expect most recent first, limited to 2
     assert refs == ["FAIL-3", "FAIL-2"]
+
+
+@pytest.mark.django_db
+def test_get_intent_by_reference_caches_and_invalidates():
+    from django.core.cache import cache
+    from payments.selectors import invalidate_intent_cache
+
+    user = UserFactory()
+    order = Order.objects.create(user=user, email=getattr(user, "email", None))
+    PaymentIntent.objects.create(order=order, reference="SEL-C-1", amount=Decimal("5.00"), currency=Currency.NGN)
+
+    first = get_intent_by_reference("SEL-C-1")
+    assert first is not None
+    # Second lookup is served from cache, surviving a DB-side change
+    PaymentIntent.objects.filter(reference="SEL-C-1").update(amount=Decimal("7.00"))
+    assert get_intent_by_reference("SEL-C-1").amount == Decimal("5.00")
+
+    invalidate_intent_cache("SEL-C-1")
+    assert get_intent_by_reference("SEL-C-1").amount == Decimal("7.00")
+
+    # Misses are not cached
+    assert get_intent_by_reference("SEL-C-missing") is None
+    cache.clear()
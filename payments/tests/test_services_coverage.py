@@ -12,9 +12,16 @@ from payments.services import (
     initialize_paystack_transaction,
     validate_paystack_signature,
 )
+from payments.tests.helpers import FakePaystackResponse
 
 pytestmark = pytest.mark.django_db
 
+# Minor-unit amounts for the finalize paths, pre-bound so the tests do not
+# re-run the Decimal conversion they are not covering; the conversion itself
+# is exercised by test_to_minor_units_maps_and_defaults.
+MINOR_9_NGN = 900
+MINOR_10_NGN = 1000
+
 
 def make_order():
     user = UserFactory()
@@ -35,16 +42,8 @@ def test_initialize_paystack_transaction_success(settings):
     settings.PAYSTACK_BASE_URL = "https://api.paystack.co"
     order = make_order()
 
-    class Resp:
-        status_code = 200
-
-        def json(self):
-            return {
-                "status": True,
-                "data": {"authorization_url": "auth", "access_code": "code"},
-            }
-
-    with patch("payments.services.httpx.post", return_value=Resp()):
+    ok_resp = FakePaystackResponse(body={"status": True, "data": {"authorization_url": "auth", "access_code": "code"}})
+    with patch("payments.services._post", return_value=ok_resp):
         intent, data = initialize_paystack_transaction(
             order=order,
             amount=Decimal("10.00"),
@@ -61,13 +60,8 @@ def test_initialize_paystack_transaction_failure(settings):
     settings.PAYSTACK_SECRET_KEY = "sk"
     order = make_order()
 
-    class RespBad:
-        status_code = 500
-
-        def json(self):
-            return {"status": False}
-
-    with patch("payments.services.httpx.post", return_value=RespBad()):
+    bad_resp = FakePaystackResponse(status_code=500, body={"status": False})
+    with patch("payments.services._post", return_value=bad_resp):
         with pytest.raises(ValueError):
             initialize_paystack_transaction(
                 order=order,
@@ -102,7 +96,7 @@ def test_finalize_intent_paths(settings):
     )
 
     # amount mismatch -> failed
-    event_bad = {"data": {"amount": _to_minor_units(Decimal("9.00"), "NGN")}}
+    event_bad = {"data": {"amount": MINOR_9_NGN}}
     finalize_intent_and_order(intent=intent, event=event_bad)
     intent.refresh_from_db()
     assert intent.status == PaymentIntent.STATUS_FAILED
@@ -110,12 +104,12 @@ def test_finalize_intent_paths(settings):
     # already succeeded -> return
     intent.status = PaymentIntent.STATUS_SUCCEEDED
     intent.save(update_fields=["status"])
-    finalize_intent_and_order(intent=intent, event={"data": {"amount": 1000}})
+    finalize_intent_and_order(intent=intent, event={"data": {"amount": MINOR_10_NGN}})
 
     # reset and success path
     intent.status = PaymentIntent.STATUS_INITIALIZED
     intent.save(update_fields=["status"])
-    event_ok = {"data": {"amount": _to_minor_units(intent.amount, intent.currency)}}
+    event_ok = {"data": {"amount": MINOR_10_NGN}}
     with patch("payments.services.pay_order", side_effect=Exception("boom")):
         finalize_intent_and_order(intent=intent, event=event_ok)
     intent.refresh_from_db()
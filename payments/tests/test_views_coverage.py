@@ -1,133 +1,204 @@
-import hashlib
-import hmac
-import json
 from decimal import Decimal
+from unittest import mock
 
 import pytest
 from cart.tests.factories import UserFactory
-from catalog.tests.factories import ProductVariantFactory
+from django.core.cache import cache
+from django.test import override_settings
 from django.urls import reverse
-from orders.models import Order, OrderItem
 from payments.models import PaymentIntent
-from rest_framework.test import APIClient
+from payments.serializers import PaymentIntentSerializer, _serialize_intent_fast
+from payments.tests.helpers import intent_detail_url, signature_table
 
 pytestmark = pytest.mark.django_db
 
 
-def make_order_with_item(user=None) -> Order:
-    user = user or UserFactory()
-    order = Order.objects.create(user=user, email=user.email)
-    variant = ProductVariantFactory(price=Decimal("25.00"))
-    OrderItem.objects.create(
-        order=order,
-        variant=variant,
-        product_title=variant.product.title,
-        variant_sku=variant.sku,
-        quantity=2,
-        unit_price=Decimal("25.00"),
-    )
-    return order
-
-
-def test_payment_intent_detail_404s():
-    api = APIClient()
-    u1 = UserFactory()
-    u2 = UserFactory()
-    api.force_authenticate(user=u1)
+@pytest.fixture(scope="module", autouse=True)
+def _paystack_settings():
+    """Apply the module's Paystack config once instead of per test."""
+    with override_settings(
+        PAYSTACK_SECRET_KEY="secret",
+        PAYSTACK_WEBHOOK_IPS=[],
+        PAYSTACK_SUPPORTED_CURRENCIES=["NGN"],
+    ):
+        yield
+
+
+# Static routes resolved once per module
+INIT_URL = reverse("payments:paystack-initialize")
+WEBHOOK_URL = reverse("payments:paystack-webhook")
+
+
+_WEBHOOK_SECRET = b"secret"
+_BODY_NOOP = b'{"event": "noop", "data": {}}'
+_BODY_NOT_JSON = b"not-json"
+_BODY_REF_MISSING = b'{"event": "charge.success", "data": {"reference": "missing"}}'
+_BODY_DUP_NOOP = b'{"event": "noop", "data": {"reference": "dup"}}'
+_BODY_DUP_NOOP_2 = b'{"event": "noop", "data": {"reference": "dup", "n": 2}}'
+_BODY_DUP2_NOOP = b'{"event": "noop", "data": {"reference": "dup2"}}'
+_BODY_DUP_SUCCESS = b'{"event": "charge.success", "data": {"reference": "dup"}}'
+_BODY_DUP_FAILED = b'{"event": "charge.failed", "data": {"reference": "dup"}}'
+_SIGS = signature_table(
+    _WEBHOOK_SECRET,
+    (
+        _BODY_NOOP,
+        _BODY_NOT_JSON,
+        _BODY_REF_MISSING,
+        _BODY_DUP_NOOP,
+        _BODY_DUP_NOOP_2,
+        _BODY_DUP2_NOOP,
+        _BODY_DUP_SUCCESS,
+        _BODY_DUP_FAILED,
+    ),
+)
+
+
+def test_payment_intent_detail_404s(auth_client, make_order_with_item):
+    other = UserFactory()
     # Not found
-    r1 = api.get(reverse("payments:payment-intent-detail", kwargs={"reference": "missing"}))
+    r1 = auth_client.get(intent_detail_url("missing"))
     assert r1.status_code == 404
     # Non-owner
-    order = make_order_with_item(user=u2)
+    order = make_order_with_item(user=other)
     intent = PaymentIntent.objects.create(order=order, reference="r-1", amount=Decimal("10.00"), currency="NGN")
-    r2 = api.get(reverse("payments:payment-intent-detail", kwargs={"reference": intent.reference}))
+    r2 = auth_client.get(intent_detail_url(intent.reference))
     assert r2.status_code == 404
 
 
-def test_paystack_initialize_validation_branches(settings):
-    settings.PAYSTACK_SUPPORTED_CURRENCIES = ["NGN"]
-    api = APIClient()
-    user = UserFactory()
-    api.force_authenticate(user=user)
+@pytest.mark.parametrize(
+    "payload,expected_status,expected_detail",
+    [
+        ({"currency": "NGN"}, 400, "order_id is required"),
+        ({"order_id": "SELF", "amount": "x", "currency": "NGN"}, 400, "Invalid amount"),
+        ({"order_id": "SELF", "currency": "BAD"}, 400, "Unsupported currency"),
+        ({"order_id": 999999, "currency": "NGN"}, 404, None),
+        # Supported list rejects USD
+        ({"order_id": "SELF", "currency": "USD"}, 400, "Unsupported currency"),
+    ],
+)
+def test_paystack_initialize_validation_branches(
+    auth_client, user, make_order_with_item, payload, expected_status, expected_detail
+):
     order = make_order_with_item(user=user)
-    url = reverse("payments:paystack-initialize")
-    # Missing order_id -> specific error
-    r1 = api.post(url, data={"currency": "NGN"}, format="json")
-    assert r1.status_code == 400 and r1.json()["detail"] == "order_id is required"
-    # Invalid amount -> specific error
-    r2 = api.post(url, data={"order_id": order.id, "amount": "x", "currency": "NGN"}, format="json")
-    assert r2.status_code == 400 and r2.json()["detail"] == "Invalid amount"
-    # Invalid currency -> specific error
-    r3 = api.post(url, data={"order_id": order.id, "currency": "BAD"}, format="json")
-    assert r3.status_code == 400 and r3.json()["detail"] == "Unsupported currency"
-    # Order not found -> 404
-    r4 = api.post(url, data={"order_id": 999999, "currency": "NGN"}, format="json")
-    assert r4.status_code == 404
-    # Supported list rejects USD
-    r5 = api.post(url, data={"order_id": order.id, "currency": "USD"}, format="json")
-    assert r5.status_code == 400 and r5.json()["detail"] == "Unsupported currency"
+    data = {**payload}
+    if data.get("order_id") == "SELF":
+        data["order_id"] = order.id
+    r = auth_client.post(INIT_URL, data=data, format="json")
+    assert r.status_code == expected_status
+    if expected_detail:
+        assert r.json()["detail"] == expected_detail
 
 
-def test_paystack_webhook_paths(settings):
-    settings.PAYSTACK_SECRET_KEY = "secret"
-    settings.PAYSTACK_WEBHOOK_IPS = []
-    api = APIClient()
-    url = reverse("payments:paystack-webhook")
+def test_paystack_webhook_paths(api_client, make_order_with_item):
+    # Oversized body rejected before signature verification
+    r0 = api_client.post(WEBHOOK_URL, data=b"x" * 70000, content_type="application/json")
+    assert r0.status_code == 413
 
     # Invalid signature
-    body = json.dumps({"event": "noop", "data": {}}).encode("utf-8")
-    r1 = api.post(url, data=body, content_type="application/json", HTTP_X_PAYSTACK_SIGNATURE="bad")
+    r1 = api_client.post(WEBHOOK_URL, data=_BODY_NOOP, content_type="application/json", HTTP_X_PAYSTACK_SIGNATURE="bad")
     assert r1.status_code == 401
 
     # Invalid payload (signature matches raw body but JSON decode fails)
-    raw_bad = b"not-json"
-    sig_bad = hmac.new(b"secret", raw_bad, hashlib.sha512).hexdigest()
-    r2 = api.post(url, data=raw_bad, content_type="application/json", HTTP_X_PAYSTACK_SIGNATURE=sig_bad)
+    r2 = api_client.post(
+        WEBHOOK_URL,
+        data=_BODY_NOT_JSON,
+        content_type="application/json",
+        HTTP_X_PAYSTACK_SIGNATURE=_SIGS[_BODY_NOT_JSON],
+    )
     assert r2.status_code == 400
 
     # Missing reference
-    good_sig2 = hmac.new(b"secret", body, hashlib.sha512).hexdigest()
-    r3 = api.post(url, data=body, content_type="application/json", HTTP_X_PAYSTACK_SIGNATURE=good_sig2)
+    r3 = api_client.post(
+        WEBHOOK_URL, data=_BODY_NOOP, content_type="application/json", HTTP_X_PAYSTACK_SIGNATURE=_SIGS[_BODY_NOOP]
+    )
     assert r3.status_code == 400 and r3.json()["detail"] == "Missing reference"
 
     # Intent not found
-    payload_nf = json.dumps({"event": "charge.success", "data": {"reference": "missing"}}).encode("utf-8")
-    sig_nf = hmac.new(b"secret", payload_nf, hashlib.sha512).hexdigest()
-    r4 = api.post(url, data=payload_nf, content_type="application/json", HTTP_X_PAYSTACK_SIGNATURE=sig_nf)
+    r4 = api_client.post(
+        WEBHOOK_URL,
+        data=_BODY_REF_MISSING,
+        content_type="application/json",
+        HTTP_X_PAYSTACK_SIGNATURE=_SIGS[_BODY_REF_MISSING],
+    )
     assert r4.status_code == 404
 
     # Duplicate payload ignored (and idempotency tracking exception tolerated)
     user = UserFactory()
     order = make_order_with_item(user=user)
-    intent = PaymentIntent.objects.create(order=order, reference="dup", amount=Decimal("10.00"), currency="NGN")
-    payload_dup = json.dumps({"event": "noop", "data": {"reference": intent.reference}}).encode("utf-8")
-    sig_dup = hmac.new(b"secret", payload_dup, hashlib.sha512).hexdigest()
-    r5 = api.post(url, data=payload_dup, content_type="application/json", HTTP_X_PAYSTACK_SIGNATURE=sig_dup)
+    PaymentIntent.objects.create(order=order, reference="dup", amount=Decimal("10.00"), currency="NGN")
+    r5 = api_client.post(
+        WEBHOOK_URL,
+        data=_BODY_DUP_NOOP,
+        content_type="application/json",
+        HTTP_X_PAYSTACK_SIGNATURE=_SIGS[_BODY_DUP_NOOP],
+    )
     assert r5.status_code == 200
-    # Simulate exception during metadata save to hit tolerance branch
-    from payments import views as payments_views
 
-    original_save = payments_views.PaymentIntent.save
+    # Replay of the same payload: clear the short-term dedup cache so the
+    # durable last_webhook_hash stored on the intent has to catch it
+    cache.clear()
+    r6 = api_client.post(
+        WEBHOOK_URL,
+        data=_BODY_DUP_NOOP,
+        content_type="application/json",
+        HTTP_X_PAYSTACK_SIGNATURE=_SIGS[_BODY_DUP_NOOP],
+    )
+    assert r6.status_code == 200 and r6.json()["status"] == "ignored"
+
+    # Simulate exception during metadata save to hit tolerance branch;
+    # a fresh body so neither dedup layer answers first
+    original_save = PaymentIntent.save
 
     def failing_save(self, *args, **kwargs):
         if kwargs.get("update_fields") == ["metadata", "updated_at"]:
             raise Exception("boom")
         return original_save(self, *args, **kwargs)
 
-    payments_views.PaymentIntent.save = failing_save
-
-    r6 = api.post(url, data=payload_dup, content_type="application/json", HTTP_X_PAYSTACK_SIGNATURE=sig_dup)
-    assert r6.status_code == 200 and r6.json()["status"] == "ignored"
-    payments_views.PaymentIntent.save = original_save
+    with mock.patch.object(PaymentIntent, "save", failing_save):
+        r6b = api_client.post(
+            WEBHOOK_URL,
+            data=_BODY_DUP_NOOP_2,
+            content_type="application/json",
+            HTTP_X_PAYSTACK_SIGNATURE=_SIGS[_BODY_DUP_NOOP_2],
+        )
+    assert r6b.status_code == 200 and r6b.json()["status"] == "ignored"
+
+    # Non-dict metadata breaks the hash compare; the tracking guard must
+    # swallow it and still answer the event
+    PaymentIntent.objects.create(
+        order=order, reference="dup2", amount=Decimal("10.00"), currency="NGN", metadata="bogus"
+    )
+    r6c = api_client.post(
+        WEBHOOK_URL,
+        data=_BODY_DUP2_NOOP,
+        content_type="application/json",
+        HTTP_X_PAYSTACK_SIGNATURE=_SIGS[_BODY_DUP2_NOOP],
+    )
+    assert r6c.status_code == 200 and r6c.json()["status"] == "ignored"
 
     # charge.success processed
-    payload_ok = json.dumps({"event": "charge.success", "data": {"reference": intent.reference}}).encode("utf-8")
-    sig_ok = hmac.new(b"secret", payload_ok, hashlib.sha512).hexdigest()
-    r7 = api.post(url, data=payload_ok, content_type="application/json", HTTP_X_PAYSTACK_SIGNATURE=sig_ok)
+    r7 = api_client.post(
+        WEBHOOK_URL,
+        data=_BODY_DUP_SUCCESS,
+        content_type="application/json",
+        HTTP_X_PAYSTACK_SIGNATURE=_SIGS[_BODY_DUP_SUCCESS],
+    )
     assert r7.status_code == 200 and r7.json()["status"] == "processed"
 
     # charge.failed processed
-    payload_fail = json.dumps({"event": "charge.failed", "data": {"reference": intent.reference}}).encode("utf-8")
-    sig_fail = hmac.new(b"secret", payload_fail, hashlib.sha512).hexdigest()
-    r8 = api.post(url, data=payload_fail, content_type="application/json", HTTP_X_PAYSTACK_SIGNATURE=sig_fail)
+    r8 = api_client.post(
+        WEBHOOK_URL,
+        data=_BODY_DUP_FAILED,
+        content_type="application/json",
+        HTTP_X_PAYSTACK_SIGNATURE=_SIGS[_BODY_DUP_FAILED],
+    )
     assert r8.status_code == 200 and r8.json()["status"] == "processed"
+
+
+def test_fast_intent_serialization_matches_serializer(make_order_with_item):
+    """The hand-built response dict must stay in lockstep with the serializer."""
+    order = make_order_with_item()
+    intent = PaymentIntent.objects.create(
+        order=order, reference="fast", amount=Decimal("10.00"), currency="NGN", metadata={"k": "v"}
+    )
+    assert _serialize_intent_fast(intent) == PaymentIntentSerializer(intent).data
@@ -59,6 +59,28 @@ def test_webhook_forbidden_ip_returns_403(settings):
     assert r.json()["detail"] == "Forbidden"
 
 
+@pytest.mark.django_db
+def test_webhook_allowlisted_netblock_admits_client(settings):
+    settings.PAYSTACK_SECRET_KEY = "sk_test_xxx"
+    # CIDR entry covering the test client's default 127.0.0.1
+    settings.PAYSTACK_WEBHOOK_IPS = ["1.2.3.4", "127.0.0.0/8"]
+
+    payload = {"event": "noop", "data": {}}
+    raw = json.dumps(payload).encode("utf-8")
+    sig = hmac.new(settings.PAYSTACK_SECRET_KEY.encode("utf-8"), msg=raw, digestmod=hashlib.sha512).hexdigest()
+
+    client = APIClient()
+    r = client.post(
+        "/api/v1/payments/webhooks/paystack/",
+        data=raw,
+        content_type="application/json",
+        HTTP_X_PAYSTACK_SIGNATURE=sig,
+    )
+    # Past the IP gate; the noop event fails later on the missing reference
+    assert r.status_code == 400
+    assert r.json()["detail"] == "Missing reference"
+
+
 @pytest.mark.django_db
 def test_webhook_missing_reference_returns_400(settings):
     settings.PAYSTACK_SECRET_KEY = "sk_test_xxx"
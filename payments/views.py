@@ -3,20 +3,31 @@
 Includes healthcheck, Paystack transaction initialization, and webhook handling.
 """
 
+import hashlib
 import json
 import logging
 from decimal import Decimal
+from functools import lru_cache
+from ipaddress import ip_address, ip_network
 
 from common.choices import Currency
 from django.conf import settings
+from django.db.models import DecimalField, Sum, Value
+from django.db.models.functions import Coalesce
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
 from drf_spectacular.utils import OpenApiExample, OpenApiParameter, extend_schema, inline_serializer
 from orders.models import Order
 from orders.services import compute_request_hash, with_idempotency
+from payments import dedup
 from payments.models import PaymentIntent
-from payments.selectors import get_intent_by_reference
-from payments.serializers import PaymentIntentSerializer, PaymentIntentUpsertSerializer, PaystackInitializeSerializer
+from payments.selectors import get_intent_by_reference, invalidate_intent_cache
+from payments.serializers import (
+    PaymentIntentSerializer,
+    PaymentIntentUpsertSerializer,
+    PaystackInitializeSerializer,
+    _serialize_intent_fast,
+)
 from payments.services import (
     create_or_update_intent,
     finalize_intent_and_order,
@@ -33,6 +44,62 @@ from rest_framework.views import APIView
 logger = logging.getLogger("avthrift.payments")
 
 
+@lru_cache(maxsize=4)
+def _allowed_ip_networks(ips: tuple) -> tuple:
+    """Parse the webhook allowlist into exact IPs and CIDR networks.
+
+    Paystack publishes netblocks as well as single addresses, so entries
+    containing a "/" become ip_network objects; the rest stay a frozenset
+    for O(1) exact matching. Keyed on the configured tuple so settings
+    overrides in tests (and rotation in production) rebuild the result
+    instead of serving stale entries.
+    """
+
+    exact = []
+    networks = []
+    for entry in ips:
+        if "/" in entry:
+            networks.append(ip_network(entry, strict=False))
+        else:
+            exact.append(entry)
+    return frozenset(exact), tuple(networks)
+
+
+def _webhook_ip_allowed(remote_ip: str, ips: tuple) -> bool:
+    """Return True if `remote_ip` matches an allowlisted IP or netblock."""
+
+    exact, networks = _allowed_ip_networks(ips)
+    if remote_ip in exact:
+        return True
+    if networks:
+        try:
+            addr = ip_address(remote_ip)
+        except ValueError:
+            return False
+        return any(addr in net for net in networks)
+    return False
+
+
+@lru_cache(maxsize=4)
+def _supported_currency_set(currencies: tuple) -> frozenset:
+    """Supported-currency setting as a frozenset, built once per value.
+
+    Same shape as the webhook IP allowlist above: keyed on the configured
+    tuple so settings overrides rebuild the set.
+    """
+
+    return frozenset(currencies)
+
+
+# Order totals summed in SQL over the stored line_total column, matching the
+# subtotal annotation the orders views use
+_ORDER_ITEMS_TOTAL = Coalesce(
+    Sum("line_total"),
+    Value(Decimal("0.00")),
+    output_field=DecimalField(max_digits=14, decimal_places=2),
+)
+
+
 class PaymentsHealthView(APIView):
     """Basic health endpoint for the payments app."""
 
@@ -89,17 +156,15 @@ class PaymentIntentCreateUpdateView(APIView):
 
         order_id = body.get("order_id")
         try:
-            order = Order.objects.get(id=int(order_id), user=request.user)
+            # Only the columns this handler touches; the intent FK needs the pk
+            order = Order.objects.only("id", "user_id").get(id=order_id, user=request.user)
         except Order.DoesNotExist:
             return Response({"detail": "Order not found"}, status=status.HTTP_404_NOT_FOUND)
 
-        # Amount: compute if missing
+        # Amount: compute in the database if missing
         raw_amount = body.get("amount")
         if raw_amount is None:
-            total = Decimal("0.00")
-            for item in order.items.all():
-                total += (item.unit_price or Decimal("0.00")) * Decimal(int(item.quantity))
-            amount = total
+            amount = order.items.aggregate(total=_ORDER_ITEMS_TOTAL)["total"]
         else:
             amount = Decimal(str(raw_amount))
 
@@ -117,7 +182,7 @@ class PaymentIntentCreateUpdateView(APIView):
             metadata=metadata,
         )
 
-        return Response(PaymentIntentSerializer(intent).data)
+        return Response(_serialize_intent_fast(intent))
 
 
 class PaymentIntentDetailView(APIView):
@@ -141,7 +206,7 @@ class PaymentIntentDetailView(APIView):
             return Response({"detail": "Intent not found"}, status=status.HTTP_404_NOT_FOUND)
         if intent.order.user_id != request.user.id:
             return Response({"detail": "Intent not found"}, status=status.HTTP_404_NOT_FOUND)
-        return Response(PaymentIntentSerializer(intent).data)
+        return Response(_serialize_intent_fast(intent))
 
 
 class PaystackInitializeView(APIView):
@@ -200,7 +265,8 @@ class PaystackInitializeView(APIView):
         ],
     )
     def post(self, request, *args, **kwargs):
-        idem_key = request.headers.get("Idempotency-Key") or request.headers.get("idempotency-key")
+        # request.headers is case-insensitive; one lookup covers both spellings
+        idem_key = request.headers.get("Idempotency-Key")
         serializer = PaystackInitializeSerializer(data=request.data)
         if not serializer.is_valid():
             errs = serializer.errors or {}
@@ -230,7 +296,8 @@ class PaystackInitializeView(APIView):
         body = serializer.validated_data
         order_id = body.get("order_id")
         try:
-            order = Order.objects.get(id=int(order_id), user=request.user)
+            # Only the columns read below (reference, metadata, customer email)
+            order = Order.objects.only("id", "user_id", "number", "email").get(id=order_id, user=request.user)
         except Order.DoesNotExist:
             logger.error(
                 "payments_init_order_not_found",
@@ -238,20 +305,17 @@ class PaystackInitializeView(APIView):
             )
             return Response({"detail": "Order not found"}, status=status.HTTP_404_NOT_FOUND)
 
-        # Compute amount if not provided
+        # Compute amount in the database if not provided
         raw_amount = body.get("amount")
         if raw_amount is None:
-            total = Decimal("0.00")
-            for item in order.items.all():
-                total += (item.unit_price or Decimal("0.00")) * Decimal(int(item.quantity))
-            amount = total
+            amount = order.items.aggregate(total=_ORDER_ITEMS_TOTAL)["total"]
         else:
             amount = Decimal(str(raw_amount))
 
         # Ensure normalized uppercase
         currency = (body.get("currency") or Currency.NGN).upper()
         supported = getattr(settings, "PAYSTACK_SUPPORTED_CURRENCIES", None)
-        if supported and currency not in set(supported):
+        if supported and currency not in _supported_currency_set(tuple(supported)):
             logger.warning(
                 "payments_init_unsupported_currency",
                 extra={"user_id": getattr(request.user, "id", None), "currency": currency},
@@ -305,6 +369,50 @@ class PaystackInitializeView(APIView):
         return Response(resp_body, status=code)
 
 
+def _handle_charge_success(intent, event):
+    """Finalize the intent and order for a successful charge."""
+
+    logger.info("payments_webhook_charge_success", extra={"reference": intent.reference, "order_id": intent.order_id})
+    finalize_intent_and_order(intent=intent, event=event)
+    return Response({"status": "processed", "order_id": intent.order_id})
+
+
+def _handle_charge_failed(intent, event):
+    """Reflect a failed charge on the intent."""
+
+    intent.webhook_event = event
+    intent.status = PaymentIntent.STATUS_FAILED
+    intent.save(update_fields=["webhook_event", "status", "metadata", "updated_at"])
+    invalidate_intent_cache(intent.reference)
+    logger.info("payments_webhook_charge_failed", extra={"reference": intent.reference, "order_id": intent.order_id})
+    return Response({"status": "processed"})
+
+
+def _handle_ignored_event(intent, event):
+    """Ignore non-payment events; the staged dedup hash still has to land
+    so replays of this payload short-circuit on the metadata check."""
+
+    try:
+        intent.save(update_fields=["metadata", "updated_at"])
+        invalidate_intent_cache(intent.reference)
+    except Exception:
+        pass
+    logger.info("payments_webhook_ignored_event", extra={"event": event.get("event"), "reference": intent.reference})
+    return Response({"status": "ignored"})
+
+
+# Paystack payloads run well under 16 KB; anything larger is a probe and
+# gets rejected before we HMAC (linear in body size) or parse it
+_MAX_WEBHOOK_BODY_BYTES = 64 * 1024
+
+# O(1) dispatch by event name; new event types register here instead of
+# growing an if/elif chain in the view
+_EVENT_HANDLERS = {
+    "charge.success": _handle_charge_success,
+    "charge.failed": _handle_charge_failed,
+}
+
+
 @method_decorator(csrf_exempt, name="dispatch")
 class PaystackWebhookView(APIView):
     """Handle Paystack webhook events.
@@ -337,34 +445,56 @@ class PaystackWebhookView(APIView):
         },
     )
     def post(self, request, *args, **kwargs):
+        # Gates run cheapest-first: IP membership, then HMAC, then JSON
+        # parse, then the DB lookup — flood traffic from unknown sources is
+        # turned away before we hash or parse anything.
+        remote_ip = request.META.get("REMOTE_ADDR")
+        ips = getattr(settings, "PAYSTACK_WEBHOOK_IPS", None) or ()
+        if ips and not _webhook_ip_allowed(remote_ip or "", tuple(ips)):
+            logger.warning(
+                "payments_webhook_forbidden_ip",
+                extra={"remote_addr": remote_ip, "allowed": list(ips)},
+            )
+            return Response({"detail": "Forbidden"}, status=status.HTTP_403_FORBIDDEN)
+
+        try:
+            content_length = int(request.META.get("CONTENT_LENGTH") or 0)
+        except (TypeError, ValueError):
+            content_length = 0
+        if content_length > _MAX_WEBHOOK_BODY_BYTES:
+            logger.warning(
+                "payments_webhook_body_too_large",
+                extra={"remote_addr": remote_ip, "content_length": content_length},
+            )
+            return Response({"detail": "Payload too large"}, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
         raw = request.body or b""
-        sig = request.headers.get("x-paystack-signature") or request.headers.get("x-paystack-signature")
+        sig = request.headers.get("x-paystack-signature")
         if not validate_paystack_signature(raw, sig or ""):
             logger.warning(
                 "payments_webhook_invalid_signature",
-                extra={"remote_addr": request.META.get("REMOTE_ADDR"), "path": request.path},
+                extra={"remote_addr": remote_ip, "path": request.path},
             )
             return Response({"detail": "Invalid signature"}, status=status.HTTP_401_UNAUTHORIZED)
 
+        # Replayed payloads (Paystack retries) are answered from the cache
+        # before we parse JSON or touch the database; the per-intent
+        # last_webhook_hash below stays as the durable fallback
+        payload_hash = hashlib.blake2b(raw, digest_size=16).hexdigest()
+        if dedup.seen(payload_hash):
+            logger.info("payments_webhook_ignored_duplicate", extra={"remote_addr": remote_ip})
+            return Response({"status": "ignored"})
+
         try:
-            event = json.loads(raw.decode("utf-8"))
+            # json.loads handles UTF-8 bytes itself; no intermediate str
+            event = json.loads(raw)
         except Exception:
             logger.warning(
                 "payments_webhook_invalid_payload",
-                extra={"remote_addr": request.META.get("REMOTE_ADDR"), "path": request.path},
+                extra={"remote_addr": remote_ip, "path": request.path},
             )
             return Response({"detail": "Invalid payload"}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Optional: IP whitelist for production hardening
-        ips = getattr(settings, "PAYSTACK_WEBHOOK_IPS", [])
-        remote_ip = request.META.get("REMOTE_ADDR")
-        if ips and remote_ip not in ips:
-            logger.warning(
-                "payments_webhook_forbidden_ip",
-                extra={"remote_addr": remote_ip, "allowed": ips},
-            )
-            return Response({"detail": "Forbidden"}, status=status.HTTP_403_FORBIDDEN)
-
         ref = (event.get("data") or {}).get("reference") or (event.get("data") or {}).get("reference_code") or ""
         if not ref:
             logger.warning(
@@ -383,36 +513,28 @@ class PaystackWebhookView(APIView):
             # If no intent, we cannot finalize safely without order context
             return Response({"detail": "Intent not found"}, status=status.HTTP_404_NOT_FOUND)
 
-        # Idempotency: short-circuit if we have already processed this exact payload
+        # Idempotency: short-circuit if we have already processed this exact
+        # payload. BLAKE2b-128 is enough for a dedup tag (this is not a
+        # signature) and hashes faster than SHA-256 at half the stored size;
+        # legacy SHA-256 values simply fail the compare and re-finalize once,
+        # which finalize_intent_and_order already tolerates. The new hash is
+        # staged on the instance here and persisted by whichever status
+        # write follows, so non-duplicate events cost a single UPDATE.
         try:
-            import hashlib
-
-            payload_hash = hashlib.sha256(raw).hexdigest()
             meta = intent.metadata or {}
             if meta.get("last_webhook_hash") == payload_hash:
+                dedup.mark_seen(payload_hash)
                 logger.info("payments_webhook_ignored_duplicate", extra={"reference": ref})
                 return Response({"status": "ignored"})
             meta["last_webhook_hash"] = payload_hash
             intent.metadata = meta
-            intent.save(update_fields=["metadata", "updated_at"])
         except Exception:
             # Do not block processing on idempotency tracking failures
             pass
 
-        # Charge success is primary signal for fulfillment
-        if event.get("event") == "charge.success":
-            logger.info("payments_webhook_charge_success", extra={"reference": ref, "order_id": intent.order_id})
-            finalize_intent_and_order(intent=intent, event=event)
-            return Response({"status": "processed", "order_id": intent.order_id})
-
-        # Explicitly handle failed charges to reflect status
-        if event.get("event") == "charge.failed":
-            intent.webhook_event = event
-            intent.status = PaymentIntent.STATUS_FAILED
-            intent.save(update_fields=["webhook_event", "status", "updated_at"])
-            logger.info("payments_webhook_charge_failed", extra={"reference": ref, "order_id": intent.order_id})
-            return Response({"status": "processed"})
-
-        # Ignore non-payment events for now
-        logger.info("payments_webhook_ignored_event", extra={"event": event.get("event"), "reference": ref})
-        return Response({"status": "ignored"})
+        handler = _EVENT_HANDLERS.get(event.get("event"), _handle_ignored_event)
+        response = handler(intent, event)
+        # Every handled outcome is terminal from Paystack's point of view,
+        # so its payload hash can be answered from the cache on replay
+        dedup.mark_seen(payload_hash)
+        return response
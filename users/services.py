@@ -50,8 +50,12 @@ def send_password_reset_email(user):
     return uid, token
 
 
-def send_email_verification(user):
-    """Send an email verification link to the user's current email."""
+def send_email_verification(user, connection=None):
+    """Send an email verification link to the user's current email.
+
+    Accepts an optional mail connection so bulk callers (the admin
+    action) can reuse one SMTP session across many sends.
+    """
     uid = urlsafe_base64_encode(force_bytes(user.pk))
     token = email_verification_token.make_token(user)
     link = build_frontend_url(
@@ -63,6 +67,7 @@ def send_email_verification(user):
         message=f"Confirm your email with this link: {link}",
         from_email=None,
         recipient_list=[user.email],
+        connection=connection,
     )
     return uid, token
 